@@ -19,6 +19,8 @@ class CeleryConfig(AppConfig):
         APP.config_from_object('django.conf:settings', namespace='CELERY')
         installed_apps = [app_config.name for app_config in apps.get_app_configs()]
         APP.autodiscover_tasks(installed_apps, force=True)
+        # Connects the task signal handlers that time tasks.
+        from . import metrics  # noqa: F401
 
     def tearDown(self):
         ...
@@ -0,0 +1,202 @@
+"""
+Prometheus metrics for the API and Celery tasks.
+
+``MetricsMiddleware`` records request latency and query counts per route
+(each ``JobViewSet`` action has its own route name), caches report their
+hits and misses with ``record_cache_lookup()``, and Celery signals record
+task run time and lag behind the task's ETA. ``metrics_view`` serves them in
+the Prometheus text format along with the collectors registered with
+``register_scrape_collector()``, which are only evaluated when scraped.
+
+Metrics live in process memory. With several worker processes (gunicorn
+workers, Celery's prefork pool) set ``PROMETHEUS_MULTIPROC_DIR`` to an empty
+directory shared by the processes of a host, so that every process writes
+its samples there and a scrape adds them up.
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery.signals import task_postrun, task_prerun, worker_ready
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+REQUEST_LATENCY = Histogram(
+    "jobboard_request_duration_seconds",
+    "Time to respond to a request, per route",
+    ["view", "method", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    "jobboard_request_db_queries",
+    "Database queries made to respond to a request, per route",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+CACHE_LOOKUPS = Counter(
+    "jobboard_cache_lookups",
+    "Cache lookups, per cache and result (hit or miss)",
+    ["cache", "result"],
+)
+TASK_DURATION = Histogram(
+    "jobboard_celery_task_duration_seconds",
+    "Run time of Celery tasks, per task and final state",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+TASK_LAG = Histogram(
+    "jobboard_celery_task_lag_seconds",
+    "Time between the ETA of a Celery task and the start of its run",
+    ["task"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600),
+)
+
+# Collectors that are only evaluated when the metrics are scraped
+scrape_registry = CollectorRegistry()
+
+_request_queries = ContextVar("request_queries", default=None)
+_task_starts: dict[str, float] = {}
+
+
+def register_scrape_collector(collector) -> None:
+    scrape_registry.register(collector)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def count_query(execute, sql, params, many, context):
+    queries = _request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(connection, **kwargs) -> None:
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def process_registry() -> CollectorRegistry:
+    """This process' metrics, or those of every process in multiprocess mode"""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Under ASGI, stay async so that requests do not hop threads here.
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Async views query from other threads, so every connection counts.
+        connection_created.connect(install_query_counter)
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        queries = [0]
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.observe(request, response, time.perf_counter() - start, queries[0])
+        return response
+
+    async def __acall__(self, request):
+        queries = [0]
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.observe(request, response, time.perf_counter() - start, queries[0])
+        return response
+
+    def observe(self, request, response, duration: float, queries: int) -> None:
+        match = request.resolver_match
+        # Unmatched paths share a label, so that scans cannot add series.
+        view = match.view_name if match else "unmatched"
+        REQUEST_LATENCY.labels(view, request.method, response.status_code).observe(
+            duration
+        )
+        REQUEST_QUERIES.labels(view).observe(queries)
+
+
+def metrics_view(request):
+    """Expose the metrics in the Prometheus text format"""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if settings.METRICS_TOKEN and not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponse(status=401)
+    output = generate_latest(process_registry()) + generate_latest(scrape_registry)
+    return HttpResponse(output, content_type=CONTENT_TYPE_LATEST)
+
+
+@task_prerun.connect
+def start_task_timer(task_id, task, **kwargs):
+    _task_starts[task_id] = time.perf_counter()
+    eta = task.request.eta
+    if eta:
+        if isinstance(eta, str):
+            eta = datetime.fromisoformat(eta)
+        if timezone.is_naive(eta):
+            eta = timezone.make_aware(eta, dt_timezone.utc)
+        lag = (timezone.now() - eta).total_seconds()
+        TASK_LAG.labels(task.name).observe(max(lag, 0))
+
+
+@task_postrun.connect
+def stop_task_timer(task_id, task, state=None, **kwargs):
+    start = _task_starts.pop(task_id, None)
+    if start is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(
+            time.perf_counter() - start
+        )
+
+
+@worker_ready.connect
+def serve_worker_metrics(**kwargs):
+    """
+    Expose the task metrics of the worker's processes on
+    ``METRICS_CELERY_PORT``, if set; the settings require multiprocess mode
+    along with it.
+    """
+    if settings.METRICS_CELERY_PORT:
+        start_http_server(settings.METRICS_CELERY_PORT, registry=process_registry())
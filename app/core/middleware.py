@@ -0,0 +1,97 @@
+import hashlib
+import secrets
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+
+from .routers import use_replica
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Identifies clients without credentials, which may share an address behind a proxy
+PIN_COOKIE = "primary_pin"
+
+
+def client_pin_id(request) -> str | None:
+    """The client's credentials, else the pin cookie set on its last write"""
+    return request.headers.get("Authorization") or request.COOKIES.get(PIN_COOKIE)
+
+
+def client_pin_key(pin_id: str) -> str:
+    """Cache key of the primary pin of the client identified by ``pin_id``"""
+    return "pin-primary:" + hashlib.sha256(pin_id.encode()).hexdigest()
+
+
+def set_pin_cookie(request, response, pin_id: str) -> None:
+    if not request.headers.get("Authorization"):
+        response.set_cookie(
+            PIN_COOKIE,
+            pin_id,
+            max_age=settings.DATABASE_PRIMARY_PIN_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+
+
+class PrimaryPinningMiddleware:
+    """
+    Serve a client's safe requests from the read replica, except for
+    ``DATABASE_PRIMARY_PIN_SECONDS`` after it sends an unsafe one, so that a
+    client reads its own writes however far the replica lags behind.
+    Clients are told apart by their credentials, else by a cookie set on the
+    response to their write.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Under ASGI, stay async so that requests do not hop threads here.
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICA_ALIAS:
+            return self.get_response(request)
+
+        cache = caches[settings.DATABASE_PIN_CACHE_ALIAS]
+        pin_id = client_pin_id(request)
+        if request.method not in SAFE_METHODS:
+            pin_id = pin_id or secrets.token_urlsafe()
+            try:
+                response = self.get_response(request)
+            finally:
+                cache.set(
+                    client_pin_key(pin_id), True, settings.DATABASE_PRIMARY_PIN_SECONDS
+                )
+            set_pin_cookie(request, response, pin_id)
+            return response
+
+        pinned = pin_id is not None and cache.get(client_pin_key(pin_id))
+        with use_replica(not pinned):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICA_ALIAS:
+            return await self.get_response(request)
+
+        cache = caches[settings.DATABASE_PIN_CACHE_ALIAS]
+        pin_id = client_pin_id(request)
+        if request.method not in SAFE_METHODS:
+            pin_id = pin_id or secrets.token_urlsafe()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await cache.aset(
+                    client_pin_key(pin_id), True, settings.DATABASE_PRIMARY_PIN_SECONDS
+                )
+            set_pin_cookie(request, response, pin_id)
+            return response
+
+        pinned = pin_id is not None and await cache.aget(client_pin_key(pin_id))
+        with use_replica(not pinned):
+            return await self.get_response(request)
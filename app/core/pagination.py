@@ -1,31 +1,405 @@
+import hashlib
+import json
 import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+from uuid import UUID
 
-from rest_framework.pagination import PageNumberPagination
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.paginator import (
+    EmptyPage,
+    InvalidPage,
+    Page,
+    PageNotAnInteger,
+    Paginator,
+)
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+)
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 DEFAULT_PAGE = 1
 
 
+def estimate_count(queryset) -> int | None:
+    """
+    Return the Postgres planner's row estimate for ``queryset``.
+
+    The estimate comes from the table statistics (``pg_class.reltuples``
+    and the column histograms) through ``EXPLAIN``, so it costs a planning
+    round trip rather than a scan. Estimates are cached per query in
+    ``PAGINATION_CACHE_ALIAS`` for ``PAGINATION_COUNT_ESTIMATE_TIMEOUT``
+    seconds. Returns None on other database backends.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha1(repr((queryset.db, sql, params)).encode()).hexdigest()
+    cache_key = f"pagination:estimate:{digest}"
+    cache = caches[settings.PAGINATION_CACHE_ALIAS]
+    estimate = cache.get(cache_key)
+    if estimate is None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        cache.set(cache_key, estimate, settings.PAGINATION_COUNT_ESTIMATE_TIMEOUT)
+    return estimate
+
+
+def approximate_count(queryset) -> tuple[int, bool]:
+    """
+    Count ``queryset``, falling back to the planner estimate when it is at
+    or above ``PAGINATION_APPROXIMATE_COUNT_THRESHOLD`` rows.
+
+    Returns the count and whether it is exact.
+    """
+    threshold = settings.PAGINATION_APPROXIMATE_COUNT_THRESHOLD
+    if threshold:
+        estimate = estimate_count(queryset)
+        if estimate is not None and estimate >= threshold:
+            return estimate, False
+    return queryset.count(), True
+
+
+class ApproximatePage(Page):
+    has_more = None
+
+    def has_next(self):
+        if self.has_more is None:
+            return super().has_next()
+        return self.has_more
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator whose count may be a planner estimate for large result sets.
+
+    When the count is approximate, pages are not bounded by it: each page
+    fetches one extra row to tell whether a next page exists.
+    """
+
+    @cached_property
+    def count_and_exactness(self) -> tuple[int, bool]:
+        if not hasattr(self.object_list, "query"):
+            return len(self.object_list), True
+        return approximate_count(self.object_list)
+
+    @cached_property
+    def count(self):
+        return self.count_and_exactness[0]
+
+    @property
+    def is_exact(self) -> bool:
+        return self.count_and_exactness[1]
+
+    def validate_number(self, number):
+        if self.is_exact:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        if self.is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        return self.approximate_page(list(self.lookahead_slice(number)), number)
+
+    async def acount_and_exactness(self) -> tuple[int, bool]:
+        """``count_and_exactness`` for async callers, who must await it first"""
+        if "count_and_exactness" not in self.__dict__:
+            if settings.PAGINATION_APPROXIMATE_COUNT_THRESHOLD:
+                count = await sync_to_async(approximate_count)(self.object_list)
+            else:
+                count = (await self.object_list.acount(), True)
+            self.__dict__["count_and_exactness"] = count
+        return self.count_and_exactness
+
+    async def apage(self, number):
+        """``page()`` with the count and rows fetched by the async ORM"""
+        await self.acount_and_exactness()
+        number = self.validate_number(number)
+        if self.is_exact:
+            page = super().page(number)
+            page.object_list = [row async for row in page.object_list]
+            return page
+        rows = [row async for row in self.lookahead_slice(number)]
+        return self.approximate_page(rows, number)
+
+    def lookahead_slice(self, number: int):
+        """The rows of page ``number`` and one more, if there is one"""
+        bottom = (number - 1) * self.per_page
+        return self.object_list[bottom : bottom + self.per_page + 1]
+
+    def approximate_page(self, rows: list, number: int) -> ApproximatePage:
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        page = self._get_page(rows[: self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return ApproximatePage(*args, **kwargs)
+
+
 class CustomPagination(PageNumberPagination):
     page_size_query_param = "page_size"
+    django_paginator_class = ApproximateCountPaginator
 
     def get_paginated_response(self, data):
+        paginator: ApproximateCountPaginator = self.page.paginator
         return Response(
             {
                 "links": {
                     "next": self.get_next_link(),
                     "previous": self.get_previous_link(),
                 },
-                "total": self.page.paginator.count,
-                "total_pages": math.ceil(self.page.paginator.count / self.page_size),
+                "total": paginator.count,
+                "total_is_exact": paginator.is_exact,
+                "total_pages": math.ceil(paginator.count / paginator.per_page),
                 "current_page": int(self.request.GET.get("page", DEFAULT_PAGE)),
                 "page_size": int(self.request.GET.get("page_size", self.page_size)),
                 "results": data,
             }
         )
 
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset()`` for async views"""
+        self.request = request
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        await paginator.acount_and_exactness()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = await paginator.apage(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+        return list(self.page)
+
 
 class StandardResultsPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = "page_size"
     max_page_size = 1000
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over every field of the queryset's ordering.
+
+    The primary key is appended to the ordering as a tiebreaker, and a page
+    is located with a WHERE clause on the last row seen instead of an
+    OFFSET, so deep pages cost the same as the first one. The total is only
+    counted when the client asks for it with ``include_total=true``, and may
+    be a planner estimate for large result sets. Ordering fields are
+    expected to be non-nullable.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    include_total_query_param = "include_total"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_keyset_ordering(queryset)
+        self.total, self.total_is_exact = None, None
+        if request.query_params.get(self.include_total_query_param) == "true":
+            self.total, self.total_is_exact = approximate_count(queryset)
+
+        position, reverse = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.ordering)
+        # The cursor's values come from the client, so values of the wrong
+        # type can fail when the filter is built as well as when it runs.
+        try:
+            if position is not None:
+                queryset = queryset.filter(self.get_position_filter(position, reverse))
+            if reverse:
+                queryset = queryset.reverse()
+            # Fetch one extra row to find out whether there is a further page.
+            results = list(queryset[: self.page_size + 1])
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_keyset_ordering(self, queryset) -> list:
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        pk_name = queryset.model._meta.pk.name
+        if not {pk_name, "pk"} & {field.lstrip("-") for field in ordering}:
+            descending = bool(ordering) and ordering[-1].startswith("-")
+            ordering.append(f"-{pk_name}" if descending else pk_name)
+        return ordering
+
+    def get_position_filter(self, position: list, reverse: bool) -> Q:
+        """Match the rows that come after (or before) ``position`` in the ordering"""
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition, preceding_equal = Q(), Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            descending = field.startswith("-")
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= preceding_equal & Q(**{f"{name}__{lookup}": value})
+            preceding_equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, instance) -> list:
+        position = []
+        for field in self.ordering:
+            value = getattr(instance, field.lstrip("-"))
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            elif isinstance(value, UUID):
+                value = str(value)
+            position.append(value)
+        return position
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            return list(cursor["p"]), bool(cursor.get("r", False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position: list, reverse: bool) -> str:
+        cursor = json.dumps({"p": position, "r": reverse}, separators=(",", ":"))
+        encoded = urlsafe_b64encode(cursor.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "links": {
+                    "next": self.get_next_link(),
+                    "previous": self.get_previous_link(),
+                },
+                "total": self.total,
+                "total_is_exact": self.total_is_exact,
+                "page_size": self.page_size,
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "links": {
+                    "type": "object",
+                    "properties": {
+                        "next": {"type": "string", "nullable": True},
+                        "previous": {"type": "string", "nullable": True},
+                    },
+                },
+                "total": {"type": "integer", "nullable": True},
+                "total_is_exact": {"type": "boolean", "nullable": True},
+                "page_size": {"type": "integer"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.include_total_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to true to include the total number of results.",
+                "schema": {"type": "boolean"},
+            }
+        ]
+
+
+class SelectablePagination(BasePagination):
+    """
+    Lets clients pick a pagination mode with the ``pagination`` query
+    parameter, defaulting to page numbers.
+    """
+
+    mode_query_param = "pagination"
+    default_mode = "page"
+    modes = {
+        "page": CustomPagination,
+        "cursor": KeysetPagination,
+    }
+
+    def get_paginator(self, request) -> BasePagination:
+        mode = request.query_params.get(self.mode_query_param, self.default_mode)
+        if mode not in self.modes:
+            raise NotFound(f"Unknown pagination mode: {mode}")
+        return self.modes[mode]()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async counterpart of ``paginate_queryset``, for modes that have one"""
+        self.paginator = self.get_paginator(request)
+        return await self.paginator.apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.modes[self.default_mode]().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        parameters = {}
+        for pagination_class in self.modes.values():
+            for parameter in pagination_class().get_schema_operation_parameters(view):
+                parameters.setdefault(parameter["name"], parameter)
+        return [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Pagination mode.",
+                "schema": {"type": "string", "enum": list(self.modes)},
+            },
+            *parameters.values(),
+        ]
@@ -0,0 +1,265 @@
+"""
+Opt-in request profiling.
+
+With ``PROFILING_ENABLED``, ``ProfilingMiddleware`` profiles a
+``PROFILING_SAMPLE_RATE`` share of requests. For each one it records the
+number of queries and their total time, the slowest query, the time spent in
+profiled serializers and the response size. The profile is sent back to
+admins in a ``Server-Timing`` header and kept in a ring buffer of the last
+``PROFILING_BUFFER_SIZE`` profiles of the process, which ``ProfilingReportView``
+summarizes per endpoint for admins. Requests that are not sampled only pay
+for a context variable lookup per query.
+"""
+
+import math
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+_current_profile = ContextVar("current_profile", default=None)
+_profiles_lock = threading.Lock()
+_profiles: deque = deque(maxlen=1000)
+
+# Longer statements are cut to this many characters
+MAX_SQL_LENGTH = 1000
+
+
+@dataclass
+class Profile:
+    method: str
+    path: str
+    endpoint: str = ""
+    status: int = 0
+    duration_ms: float = 0.0
+    queries: int = 0
+    db_ms: float = 0.0
+    slowest_sql: str = ""
+    slowest_sql_ms: float = 0.0
+    sections_ms: dict = field(default_factory=dict)
+    response_bytes: int | None = None
+    _open_sections: set = field(default_factory=set, repr=False)
+
+    def add_query(self, sql: str, elapsed_ms: float) -> None:
+        self.queries += 1
+        self.db_ms += elapsed_ms
+        if elapsed_ms > self.slowest_sql_ms:
+            self.slowest_sql, self.slowest_sql_ms = sql[:MAX_SQL_LENGTH], elapsed_ms
+
+    def server_timing(self) -> str:
+        metrics = [
+            f'db;dur={self.db_ms:.2f};desc="{self.queries} queries"',
+            *(f"{name};dur={ms:.2f}" for name, ms in self.sections_ms.items()),
+            f"total;dur={self.duration_ms:.2f}",
+        ]
+        return ", ".join(metrics)
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        del data["_open_sections"]
+        return data
+
+
+@contextmanager
+def section(name: str):
+    """Add the time spent in this block to the current profile's ``name``"""
+    profile = _current_profile.get()
+    if profile is None or name in profile._open_sections:
+        # Not profiling, or already timed by an enclosing block.
+        yield
+        return
+    profile._open_sections.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        profile.sections_ms[name] = profile.sections_ms.get(name, 0.0) + elapsed_ms
+        profile._open_sections.discard(name)
+
+
+class ProfiledSerializerMixin:
+    """Count a serializer's ``to_representation()`` as serializer time"""
+
+    def to_representation(self, instance):
+        with section("serializer"):
+            return super().to_representation(instance)
+
+
+def record_query(execute, sql, params, many, context):
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add_query(sql, (time.perf_counter() - start) * 1000)
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def recent_profiles() -> list[Profile]:
+    with _profiles_lock:
+        return list(_profiles)
+
+
+def clear_profiles() -> None:
+    with _profiles_lock:
+        _profiles.clear()
+
+
+def is_staff(request) -> bool:
+    user = getattr(request, "user", None)
+    return user is not None and user.is_staff
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Under ASGI, stay async so that requests do not hop threads here.
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        global _profiles
+        if _profiles.maxlen != settings.PROFILING_BUFFER_SIZE:
+            with _profiles_lock:
+                _profiles = deque(_profiles, maxlen=settings.PROFILING_BUFFER_SIZE)
+        # Connections are per thread, and async views query from other
+        # threads, so every connection records into the current profile.
+        connection_created.connect(install_query_recorder)
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        profile = Profile(method=request.method, path=request.path)
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        profile.duration_ms = (time.perf_counter() - start) * 1000
+        self.record(request, response, profile, show_timing=is_staff(request))
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        profile = Profile(method=request.method, path=request.path)
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        profile.duration_ms = (time.perf_counter() - start) * 1000
+        # The user may be a lazy session lookup, which cannot run in the loop.
+        show_timing = await sync_to_async(is_staff)(request)
+        self.record(request, response, profile, show_timing=show_timing)
+        return response
+
+    def record(self, request, response, profile: Profile, show_timing: bool) -> None:
+        match = request.resolver_match
+        profile.endpoint = match.view_name if match else ""
+        profile.status = response.status_code
+        if not response.streaming:
+            profile.response_bytes = len(response.content)
+        # Timings and query counts are only disclosed to admins.
+        if show_timing:
+            response["Server-Timing"] = profile.server_timing()
+        with _profiles_lock:
+            _profiles.append(profile)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(math.ceil(len(ordered) * percent / 100) - 1, 0)]
+
+
+def summarize(profiles: list[Profile]) -> list[dict]:
+    """Per endpoint averages and worst cases, busiest endpoint first"""
+    by_endpoint = defaultdict(list)
+    for profile in profiles:
+        by_endpoint[profile.endpoint or profile.path].append(profile)
+
+    summaries = []
+    for endpoint, group in by_endpoint.items():
+        durations = [profile.duration_ms for profile in group]
+        sizes = [p.response_bytes for p in group if p.response_bytes is not None]
+        slowest = max(group, key=lambda profile: profile.slowest_sql_ms)
+        summaries.append(
+            {
+                "endpoint": endpoint,
+                "requests": len(group),
+                "mean_ms": sum(durations) / len(group),
+                "p95_ms": percentile(durations, 95),
+                "mean_queries": sum(p.queries for p in group) / len(group),
+                "max_queries": max(p.queries for p in group),
+                "mean_db_ms": sum(p.db_ms for p in group) / len(group),
+                "mean_serializer_ms": sum(
+                    p.sections_ms.get("serializer", 0.0) for p in group
+                )
+                / len(group),
+                "mean_response_bytes": sum(sizes) / len(sizes) if sizes else None,
+                "slowest_sql": slowest.slowest_sql,
+                "slowest_sql_ms": slowest.slowest_sql_ms,
+            }
+        )
+    summaries.sort(key=lambda summary: summary["requests"], reverse=True)
+    return summaries
+
+
+class ProfilingReportView(APIView):
+    """
+    Summarize this process' recent request profiles per endpoint, with the
+    most recent ``limit`` (default 20) profiles
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request: Request):
+        profiles = recent_profiles()
+        try:
+            limit = max(int(request.query_params.get("limit", 20)), 0)
+        except ValueError:
+            limit = 20
+        recent = profiles[len(profiles) - limit :] if limit else []
+        return Response(
+            {
+                "pid": os.getpid(),
+                "enabled": settings.PROFILING_ENABLED,
+                "sample_rate": settings.PROFILING_SAMPLE_RATE,
+                "profiles": len(profiles),
+                "endpoints": summarize(profiles),
+                "recent": [profile.as_dict() for profile in reversed(recent)],
+            }
+        )
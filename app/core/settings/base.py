@@ -2,10 +2,17 @@
 Django settings for Job Board Project.
 """
 
+import os
 from pathlib import Path
 
 import dj_database_url
-from decouple import config
+from decouple import Csv, config
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -30,8 +37,11 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third-party Apps
     "corsheaders",
+    "django_celery_beat",
+    "django_filters",
     "drf_spectacular",
     "rest_framework.authtoken",
     "core.celery.CeleryConfig",
@@ -43,12 +53,15 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "job_posting.User"
 
 MIDDLEWARE = [
+    "core.metrics.MetricsMiddleware",
+    "core.profiling.ProfilingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.PrimaryPinningMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -78,9 +91,113 @@ WSGI_APPLICATION = "core.wsgi.application"
 ASGI_APPLICATION = "core.asgi.application"
 CORS_ALLOW_ALL_ORIGINS = True
 
-DATABASES = {"default": dj_database_url.config(default=config("DATABASE_URL"))}
+# Job board routes served by native async views under ASGI: any of list,
+# retrieve, applications and apply. Leave empty when serving over WSGI.
+JOB_ASYNC_VIEWS = config("JOB_ASYNC_VIEWS", default="", cast=Csv())
+
+# DATABASE CONNECTION SETTINGS
+# Connections are kept open for DATABASE_CONN_MAX_AGE seconds (0 closes them
+# after each request) and checked before reuse. Under ASGI, where requests
+# do not reuse their thread's connection, keep it at 0 (the default with
+# JOB_ASYNC_VIEWS) or use DATABASE_POOL: each process then keeps
+# DATABASE_POOL_MIN_SIZE to DATABASE_POOL_MAX_SIZE connections and requests
+# wait up to DATABASE_POOL_TIMEOUT seconds for one.
+DATABASE_CONN_MAX_AGE = config(
+    "DATABASE_CONN_MAX_AGE", default=0 if JOB_ASYNC_VIEWS else 60, cast=int
+)
+DATABASE_CONN_HEALTH_CHECKS = config(
+    "DATABASE_CONN_HEALTH_CHECKS", default=True, cast=bool
+)
+DATABASE_POOL = config("DATABASE_POOL", default=False, cast=bool)
+DATABASE_POOL_OPTIONS = {
+    "min_size": config("DATABASE_POOL_MIN_SIZE", default=2, cast=int),
+    "max_size": config("DATABASE_POOL_MAX_SIZE", default=10, cast=int),
+    "timeout": config("DATABASE_POOL_TIMEOUT", default=10, cast=float),
+    "max_idle": config("DATABASE_POOL_MAX_IDLE", default=600, cast=float),
+}
+
+
+def database_settings(url: str) -> dict:
+    database = dj_database_url.parse(
+        url,
+        conn_max_age=DATABASE_CONN_MAX_AGE,
+        conn_health_checks=DATABASE_CONN_HEALTH_CHECKS,
+    )
+    if DATABASE_POOL:
+        # Pooled connections go back to the pool after each request instead.
+        database["CONN_MAX_AGE"] = 0
+        database.setdefault("OPTIONS", {})["pool"] = DATABASE_POOL_OPTIONS
+    return database
 
 
+DATABASES = {"default": database_settings(config("DATABASE_URL"))}
+
+# READ REPLICA SETTINGS
+# Safe requests read from the replica at DATABASE_REPLICA_URL, if set, unless
+# the same client (its Authorization header, else the primary_pin cookie set on
+# its write response) sent an unsafe request in the last
+# DATABASE_PRIMARY_PIN_SECONDS seconds. Use a cache shared by all workers
+# (CACHE_URL) for the pins.
+DATABASE_REPLICA_URL = config("DATABASE_REPLICA_URL", default="")
+DATABASE_REPLICA_ALIAS = "replica" if DATABASE_REPLICA_URL else None
+if DATABASE_REPLICA_URL:
+    DATABASES["replica"] = {
+        **database_settings(DATABASE_REPLICA_URL),
+        # Tests read their writes through the default connection's database.
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["core.routers.PrimaryReplicaRouter"]
+DATABASE_PIN_CACHE_ALIAS = config("DATABASE_PIN_CACHE_ALIAS", default="default")
+DATABASE_PRIMARY_PIN_SECONDS = config(
+    "DATABASE_PRIMARY_PIN_SECONDS", default=5, cast=int
+)
+
+
+# PASSWORD HASHING SETTINGS
+# The hasher new and upgraded passwords use: pbkdf2, scrypt or argon2. The
+# others stay installed so existing hashes still verify and are re-hashed
+# with the preferred hasher on login.
+PASSWORD_HASHER_POLICIES = {
+    "pbkdf2": "job_posting.hashers.TunedPBKDF2PasswordHasher",
+    "scrypt": "job_posting.hashers.TunedScryptPasswordHasher",
+    "argon2": "job_posting.hashers.TunedArgon2PasswordHasher",
+}
+PASSWORD_HASHER_POLICY = config("PASSWORD_HASHER_POLICY", default="pbkdf2")
+if PASSWORD_HASHER_POLICY not in PASSWORD_HASHER_POLICIES:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER_POLICY must be one of {', '.join(PASSWORD_HASHER_POLICIES)}, "
+        f"not {PASSWORD_HASHER_POLICY!r}."
+    )
+PASSWORD_HASHERS = [PASSWORD_HASHER_POLICIES[PASSWORD_HASHER_POLICY]] + [
+    hasher
+    for policy, hasher in PASSWORD_HASHER_POLICIES.items()
+    if policy != PASSWORD_HASHER_POLICY
+]
+
+# Costs default to Django's own, so that upgrading Django raises them and
+# hashes are never re-hashed at a lower cost than Django would use.
+PASSWORD_PBKDF2_ITERATIONS = config(
+    "PASSWORD_PBKDF2_ITERATIONS", default=PBKDF2PasswordHasher.iterations, cast=int
+)
+PASSWORD_SCRYPT_WORK_FACTOR = config(
+    "PASSWORD_SCRYPT_WORK_FACTOR", default=ScryptPasswordHasher.work_factor, cast=int
+)
+PASSWORD_SCRYPT_BLOCK_SIZE = config(
+    "PASSWORD_SCRYPT_BLOCK_SIZE", default=ScryptPasswordHasher.block_size, cast=int
+)
+PASSWORD_SCRYPT_PARALLELISM = config(
+    "PASSWORD_SCRYPT_PARALLELISM", default=ScryptPasswordHasher.parallelism, cast=int
+)
+PASSWORD_ARGON2_TIME_COST = config(
+    "PASSWORD_ARGON2_TIME_COST", default=Argon2PasswordHasher.time_cost, cast=int
+)
+PASSWORD_ARGON2_MEMORY_COST = config(
+    "PASSWORD_ARGON2_MEMORY_COST", default=Argon2PasswordHasher.memory_cost, cast=int
+)
+PASSWORD_ARGON2_PARALLELISM = config(
+    "PASSWORD_ARGON2_PARALLELISM", default=Argon2PasswordHasher.parallelism, cast=int
+)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
 
@@ -104,11 +221,23 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "core.pagination.CustomPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "job_posting.authentication.CachedTokenAuthentication",
     ),
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
 }
 
+# PAGINATION SETTINGS
+# Result sets the planner estimates at or above this many rows report an
+# approximate total instead of running COUNT(*). 0 always counts exactly.
+PAGINATION_APPROXIMATE_COUNT_THRESHOLD = config(
+    "PAGINATION_APPROXIMATE_COUNT_THRESHOLD", default=0, cast=int
+)
+# Cache alias and lifetime of the planner's row estimates
+PAGINATION_CACHE_ALIAS = config("PAGINATION_CACHE_ALIAS", default="default")
+PAGINATION_COUNT_ESTIMATE_TIMEOUT = config(
+    "PAGINATION_COUNT_ESTIMATE_TIMEOUT", default=60, cast=int
+)
+
 LANGUAGE_CODE = "en-us"
 
 TIME_ZONE = "UTC"
@@ -118,6 +247,46 @@ USE_I18N = True
 USE_TZ = True
 TIME_ZONE = "Africa/Lagos"
 
+# CACHE SETTINGS
+# A redis:// (or any Redis-compatible server) URL; local memory otherwise.
+CACHE_URL = config("CACHE_URL", default="")
+
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Cache alias and lifetime of serialized job advert list and detail responses
+JOB_CACHE_ALIAS = config("JOB_CACHE_ALIAS", default="default")
+JOB_CACHE_TIMEOUT = config("JOB_CACHE_TIMEOUT", default=300, cast=int)
+
+# Cache alias and lifetime of authenticated tokens and their users
+AUTH_TOKEN_CACHE_ALIAS = config("AUTH_TOKEN_CACHE_ALIAS", default="default")
+AUTH_TOKEN_CACHE_TIMEOUT = config("AUTH_TOKEN_CACHE_TIMEOUT", default=300, cast=int)
+
+# Number of applications validated and inserted together by the bulk apply endpoint
+BULK_APPLY_BATCH_SIZE = config("BULK_APPLY_BATCH_SIZE", default=500, cast=int)
+
+# Rows fetched per round trip from the server-side cursor behind exports
+EXPORT_CHUNK_SIZE = config("EXPORT_CHUNK_SIZE", default=2000, cast=int)
+
+# Where asynchronous exports are written
+EXPORT_ROOT = config("EXPORT_ROOT", default=str(ROOT_DIR / "exports"))
+
+# Days an asynchronous export and its file are kept, and seconds between the
+# sweeps that delete older ones
+EXPORT_RETENTION_DAYS = config("EXPORT_RETENTION_DAYS", default=7, cast=int)
+EXPORT_CLEANUP_INTERVAL = config("EXPORT_CLEANUP_INTERVAL", default=3600, cast=int)
+
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
 
@@ -164,4 +333,56 @@ CELERY_BROKER_URL = RABBITMQ_URL
 CELERY_ACCEPT_CONTENT = ["application/json", "application/x-python-serialize"]
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TASK_SERIALIZER = "json"
-CELERY_TIMEZONE = 'UTC'
\ No newline at end of file
+CELERY_TIMEZONE = 'UTC'
+CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+
+# Seconds between sweeps publishing the scheduled adverts that are due
+PUBLISH_SWEEP_INTERVAL = config("PUBLISH_SWEEP_INTERVAL", default=60, cast=int)
+
+# Seconds between sweeps unpublishing expired adverts, and how many adverts
+# each of its transactions unpublishes
+EXPIRY_SWEEP_INTERVAL = config("EXPIRY_SWEEP_INTERVAL", default=300, cast=int)
+EXPIRY_SWEEP_BATCH_SIZE = config("EXPIRY_SWEEP_BATCH_SIZE", default=1000, cast=int)
+
+CELERY_BEAT_SCHEDULE = {
+    "publish-due-adverts": {
+        "task": "job_posting.tasks.publish_due_adverts",
+        "schedule": PUBLISH_SWEEP_INTERVAL,
+    },
+    "expire-adverts": {
+        "task": "job_posting.tasks.expire_adverts",
+        "schedule": EXPIRY_SWEEP_INTERVAL,
+    },
+    "delete-old-exports": {
+        "task": "job_posting.tasks.delete_old_exports",
+        "schedule": EXPORT_CLEANUP_INTERVAL,
+    },
+}
+
+
+# PROFILING SETTINGS
+# Profile a share of requests: query count and time, slowest query, serializer
+# time and response size. Profiles are sent to admins in Server-Timing headers
+# and the last PROFILING_BUFFER_SIZE of each process are summarized at
+# /api/v1/profiling/ for admins.
+PROFILING_ENABLED = config("PROFILING_ENABLED", default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config("PROFILING_SAMPLE_RATE", default=0.01, cast=float)
+PROFILING_BUFFER_SIZE = config("PROFILING_BUFFER_SIZE", default=1000, cast=int)
+
+# METRICS SETTINGS
+# With METRICS_ENABLED, Prometheus metrics are served at /metrics/, to bearer
+# METRICS_TOKEN when it is set; each scrape queries the database, so set a
+# token unless the endpoint is out of public reach. Celery workers serve
+# theirs on METRICS_CELERY_PORT when it is set. Set the
+# PROMETHEUS_MULTIPROC_DIR environment variable to a directory shared by the
+# processes of a host to add up their metrics.
+METRICS_ENABLED = config("METRICS_ENABLED", default=False, cast=bool)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+METRICS_CELERY_PORT = config("METRICS_CELERY_PORT", default=0, cast=int)
+if METRICS_CELERY_PORT and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    # Prefork pool children run the tasks and record into their own memory,
+    # so the worker's port would only serve the parent's empty histograms.
+    raise ImproperlyConfigured(
+        "METRICS_CELERY_PORT needs the PROMETHEUS_MULTIPROC_DIR environment "
+        "variable, so that the worker serves the metrics of its pool processes."
+    )
\ No newline at end of file
@@ -1,3 +1,5 @@
+from core.metrics import metrics_view
+from core.profiling import ProfilingReportView
 from django.urls import include, path
 from drf_spectacular.views import (
     SpectacularAPIView,
@@ -18,4 +20,7 @@ urlpatterns = [
     path("api/v1/auth/", include("job_posting.urls.auth")),
     path("api/v1/user/", include("job_posting.urls.user")),
     path("api/v1/posting/", include("job_posting.urls.job_posting")),
+    path("api/v1/exports/", include("job_posting.urls.export")),
+    path("api/v1/profiling/", ProfilingReportView.as_view(), name="profiling"),
+    path("metrics/", metrics_view, name="metrics"),
 ]
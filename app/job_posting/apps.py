@@ -3,4 +3,12 @@ from django.apps import AppConfig
 
 class JobPostingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'job_posting'
\ No newline at end of file
+    name = 'job_posting'
+
+    def ready(self):
+        from core.metrics import register_scrape_collector
+
+        from . import signals  # noqa: F401
+        from .metrics import ScheduledAdvertsCollector
+
+        register_scrape_collector(ScheduledAdvertsCollector())
@@ -0,0 +1,210 @@
+"""
+Native async versions of the job board's read paths and of ``apply``.
+
+Under ASGI, every DRF view runs in a worker thread. These views run on the
+event loop instead, and use the async ORM and cache APIs. ``JOB_ASYNC_VIEWS``
+picks which routes use them. Requests they do not handle fall through to
+the DRF view of the same route: other methods, non-JSON renderers and
+cursor pagination. Filtering, serialization and permissions are still done
+by a ``JobViewSet`` instance, so both versions respond the same way.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.http import Http404, HttpResponse
+from django.urls import URLPattern
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .cache import (
+    LIST_VERSION_KEY,
+    acached_response,
+    adetail_cache_key,
+    aget_version,
+    alist_cache_key,
+)
+from .models import JobAdvert
+from .serializers import JobApplicationSerializer
+from .views import JobViewSet, application_context, save_application
+
+
+class UseSyncView(Exception):
+    """Raised before any work is done when the DRF view should respond"""
+
+
+async def aauthenticate(request: Request) -> None:
+    """Authenticate ``request`` the way DRF would, without blocking the loop"""
+    for authenticator in request.authenticators:
+        if not hasattr(authenticator, "aauthenticate"):
+            raise UseSyncView
+        user_auth_tuple = await authenticator.aauthenticate(request)
+        if user_auth_tuple is not None:
+            # Recorded so that DRF does not authenticate the request again.
+            request._authenticator = authenticator
+            request.user, request.auth = user_auth_tuple
+            return
+    request._authenticator = None
+    request.user, request.auth = AnonymousUser(), None
+
+
+async def aget_object(view: JobViewSet) -> JobAdvert:
+    """``view.get_object()`` with the async ORM"""
+    queryset = view.filter_queryset(view.get_queryset())
+    try:
+        job_advert = await queryset.aget(pk=view.kwargs["pk"])
+    except (JobAdvert.DoesNotExist, ValidationError, TypeError, ValueError):
+        raise Http404
+    view.check_object_permissions(view.request, job_advert)
+    return job_advert
+
+
+def check_page_pagination(view: JobViewSet) -> None:
+    mode_query_param = view.paginator.mode_query_param
+    mode = view.request.query_params.get(mode_query_param, "page")
+    if mode != "page":
+        raise UseSyncView
+
+
+async def list_adverts(view: JobViewSet) -> Response:
+    check_page_pagination(view)
+    request = view.request
+    queryset = view.filter_queryset(view.get_queryset())
+
+    async def get_validators():
+        return view.list_validators(await aget_version(LIST_VERSION_KEY))
+
+    async def build_response():
+        page = await view.paginator.apaginate_queryset(queryset, request, view)
+        return view.get_paginated_response(view.get_serializer(page, many=True).data)
+
+    key = await alist_cache_key(request)
+    return await acached_response(request, key, get_validators, build_response)
+
+
+async def retrieve_advert(view: JobViewSet) -> Response:
+    request = view.request
+
+    async def get_validators():
+        try:
+            state = await view.get_detail_state_queryset().afirst()
+        except ValidationError:
+            state = None
+        return view.detail_validators(state)
+
+    async def build_response():
+        return Response(view.get_serializer(await aget_object(view)).data)
+
+    key = await adetail_cache_key(request, view.kwargs["pk"])
+    return await acached_response(request, key, get_validators, build_response)
+
+
+async def list_applications(view: JobViewSet) -> Response:
+    check_page_pagination(view)
+    job_advert = await aget_object(view)
+    queryset = job_advert.applications.all()
+    page = await view.paginator.apaginate_queryset(queryset, view.request, view)
+    return view.get_paginated_response(view.get_serializer(page, many=True).data)
+
+
+async def apply(view: JobViewSet) -> Response:
+    job_advert = await aget_object(view)
+    if not job_advert.is_published:
+        return Response({"error": "You can only apply for published advert"}, 400)
+
+    serializer = JobApplicationSerializer(
+        data=view.request.data, context=application_context(view.request, job_advert)
+    )
+    serializer.is_valid(raise_exception=True)
+    # The ORM has no async transactions, so the write takes one thread hop.
+    await sync_to_async(save_application)(serializer)
+    return Response({"message": "Applied Successfully."})
+
+
+# Route name -> (action, method, async view)
+ASYNC_VIEWS = {
+    "jobadvert-list": ("list", "GET", list_adverts),
+    "jobadvert-detail": ("retrieve", "GET", retrieve_advert),
+    "jobadvert-applications": ("applications", "GET", list_applications),
+    "jobadvert-apply": ("apply", "POST", apply),
+}
+
+
+async def serve(request, sync_view, handler, kwargs: dict) -> HttpResponse:
+    """Run ``handler`` with a ``JobViewSet`` set up as DRF's dispatch would"""
+    view = sync_view.cls(**sync_view.initkwargs)
+    view.action_map = sync_view.actions
+    for method, action in sync_view.actions.items():
+        setattr(view, method, getattr(view, action))
+    view.args, view.kwargs = (), kwargs
+    view.request = drf_request = view.initialize_request(request, **kwargs)
+    view.headers = view.default_response_headers
+    try:
+        view.format_kwarg = view.get_format_suffix(**kwargs)
+        renderer, media_type = view.perform_content_negotiation(drf_request)
+        if not isinstance(renderer, JSONRenderer):
+            raise UseSyncView
+        drf_request.accepted_renderer = renderer
+        drf_request.accepted_media_type = media_type
+        await aauthenticate(drf_request)
+        view.check_permissions(drf_request)
+        response = await handler(view)
+    except UseSyncView:
+        raise
+    except Exception as exc:
+        response = view.handle_exception(exc)
+
+    response = view.finalize_response(drf_request, response)
+    if not isinstance(response, Response):
+        return response
+    # Rendered here so that Django does not render it in a worker thread.
+    response.render()
+    rendered = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        rendered[header] = value
+    return rendered
+
+
+def async_route(name: str, sync_view):
+    """Serve route ``name`` with its async view, falling back to ``sync_view``"""
+    _, method, handler = ASYNC_VIEWS[name]
+    fallback = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method == method:
+            try:
+                return await serve(request, sync_view, handler, kwargs)
+            except UseSyncView:
+                pass
+        return await fallback(request, *args, **kwargs)
+
+    view.cls = sync_view.cls
+    view.initkwargs = sync_view.initkwargs
+    view.actions = sync_view.actions
+    return csrf_exempt(view)
+
+
+def async_routes(patterns: list[URLPattern], actions=None) -> list[URLPattern]:
+    """
+    Swap the views of routes whose action is in ``actions`` (by default
+    ``JOB_ASYNC_VIEWS``) for their async versions.
+    """
+    if actions is None:
+        actions = settings.JOB_ASYNC_VIEWS
+    names = {name for name, (action, *_) in ASYNC_VIEWS.items() if action in actions}
+    return [
+        (
+            URLPattern(
+                pattern.pattern,
+                async_route(pattern.name, pattern.callback),
+                pattern.default_args,
+                pattern.name,
+            )
+            if pattern.name in names
+            else pattern
+        )
+        for pattern in patterns
+    ]
@@ -0,0 +1,100 @@
+"""
+Token authentication backed by the cache.
+
+DRF's ``TokenAuthentication`` selects the token and its user on every
+request. Here the token, with its user attached, is cached under a hash of
+its key for ``AUTH_TOKEN_CACHE_TIMEOUT`` seconds. Entries are dropped as
+soon as the token is deleted (logout) or its user is saved or deleted, so
+the TTL only bounds how long a cache that missed an invalidation can go
+stale.
+"""
+
+import hashlib
+
+from core.metrics import record_cache_lookup
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+
+def get_token_cache():
+    return caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+
+
+def token_cache_key(key: str) -> str:
+    # Hashed so that raw tokens never show up in the cache server.
+    return "authtoken:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def forget_tokens(*keys: str) -> None:
+    """
+    Drop the cached entries of token ``keys``.
+
+    Inside a transaction they are dropped again on commit, so a request that
+    raced the transaction cannot keep the old entry cached.
+    """
+
+    def forget():
+        get_token_cache().delete_many([token_cache_key(key) for key in keys])
+
+    forget()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(forget)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key: str):
+        token_cache = get_token_cache()
+        cache_key = token_cache_key(key)
+        token = token_cache.get(cache_key)
+        record_cache_lookup("token", hit=token is not None)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(cache_key, token, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+        return (token.user, token)
+
+    async def aauthenticate(self, request):
+        """``authenticate()`` for async views"""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            msg = _("Invalid token header. No credentials provided.")
+            raise exceptions.AuthenticationFailed(msg)
+        elif len(auth) > 2:
+            msg = _("Invalid token header. Token string should not contain spaces.")
+            raise exceptions.AuthenticationFailed(msg)
+
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            msg = _(
+                "Invalid token header. "
+                "Token string should not contain invalid characters."
+            )
+            raise exceptions.AuthenticationFailed(msg)
+
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key: str):
+        token_cache = get_token_cache()
+        cache_key = token_cache_key(key)
+        token = await token_cache.aget(cache_key)
+        record_cache_lookup("token", hit=token is not None)
+        if token is None:
+            model = self.get_model()
+            try:
+                token = await model.objects.select_related("user").aget(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_("Invalid token."))
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+            await token_cache.aset(cache_key, token, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+        return (token.user, token)
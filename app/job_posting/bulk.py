@@ -0,0 +1,79 @@
+from itertools import islice
+from typing import Iterable, Iterator
+
+from django.db import transaction
+from rest_framework.exceptions import ParseError
+
+from .cache import invalidate_adverts
+from .models import JobAdvert, JobApplication
+from .serializers import DUPLICATE_APPLICATION, BulkJobApplicationSerializer
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def ingest_applications(rows: Iterable, batch_size: int) -> list[dict]:
+    """
+    Validate and insert job applications for any number of adverts.
+
+    Rows are handled ``batch_size`` at a time: each batch is validated in
+    one pass, checked against published adverts in one query, then
+    inserted and counted against its adverts by ``insert_new``. Rows that
+    repeat an application made before, or earlier in the batch, are
+    rejected. Returns one result per row, in input order.
+    """
+    results = []
+    for batch in batched(enumerate(rows), batch_size):
+        results.extend(ingest_batch(batch))
+    return results
+
+
+def ingest_batch(batch: list[tuple[int, object]]) -> list[dict]:
+    results, valid = {}, []
+    for index, row in batch:
+        if isinstance(row, ParseError):
+            results[index] = rejected(index, {"non_field_errors": [row.detail]})
+            continue
+        serializer = BulkJobApplicationSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = rejected(index, serializer.errors)
+
+    advert_ids = {data["job_advert_id"] for _, data in valid}
+    published_ids = set(
+        JobAdvert.objects.filter(id__in=advert_ids, is_published=True).values_list(
+            "id", flat=True
+        )
+    )
+
+    applications = []
+    for index, data in valid:
+        if data["job_advert_id"] not in published_ids:
+            results[index] = rejected(
+                index, {"job_advert": ["You can only apply for published advert"]}
+            )
+            continue
+        application = JobApplication(**data)
+        applications.append((index, application))
+        results[index] = {"index": index, "status": "created", "id": application.id}
+
+    if applications:
+        with transaction.atomic():
+            inserted = JobApplication.objects.insert_new(
+                [application for _, application in applications]
+            )
+        inserted_ids = {application.id for application in inserted}
+        for index, application in applications:
+            if application.id not in inserted_ids:
+                results[index] = rejected(index, {"email": [DUPLICATE_APPLICATION]})
+        invalidate_adverts(*{application.job_advert_id for application in inserted})
+
+    return [results[index] for index, _ in batch]
+
+
+def rejected(index: int, errors) -> dict:
+    return {"index": index, "status": "rejected", "errors": errors}
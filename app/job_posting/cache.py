@@ -0,0 +1,214 @@
+"""
+Versioned cache of serialized job advert responses.
+
+Entries are keyed by a version token instead of being deleted: changing
+an advert replaces the token, which orphans every entry built from the
+old one. The listing shares one version while each advert's detail has
+its own, so an application to one advert does not evict the others.
+
+Entries are always built from the primary database: one built from a
+lagging read replica would serve its stale data under the new version
+until it expires, even to the client whose write bumped the version.
+"""
+
+import hashlib
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from core.metrics import record_cache_lookup
+from core.routers import use_replica
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+LIST_VERSION_KEY = "jobadvert:list:version"
+
+
+def get_cache():
+    return caches[settings.JOB_CACHE_ALIAS]
+
+
+def advert_version_key(advert_id) -> str:
+    try:
+        advert_id = uuid.UUID(str(advert_id))
+    except ValueError:
+        pass
+    return f"jobadvert:{advert_id}:version"
+
+
+def new_version() -> str:
+    return uuid.uuid4().hex
+
+
+def get_version(key: str) -> str:
+    """Return the current version stored under ``key``, creating it if missing"""
+    job_cache = get_cache()
+    version = job_cache.get(key)
+    if version is None:
+        job_cache.add(key, new_version(), None)
+        version = job_cache.get(key)
+    return version
+
+
+async def aget_version(key: str) -> str:
+    job_cache = get_cache()
+    version = await job_cache.aget(key)
+    if version is None:
+        await job_cache.aadd(key, new_version(), None)
+        version = await job_cache.aget(key)
+    return version
+
+
+def invalidate_adverts(*advert_ids) -> None:
+    """
+    Bump the listing version and the detail version of ``advert_ids``.
+
+    Inside a transaction the versions are bumped again on commit, so a read
+    that raced the transaction cannot keep serving what it cached.
+    """
+
+    def bump():
+        versions = {
+            advert_version_key(advert_id): new_version() for advert_id in advert_ids
+        }
+        versions[LIST_VERSION_KEY] = new_version()
+        get_cache().set_many(versions, None)
+
+    bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
+
+
+def get_audience(request: Request) -> str:
+    # Authenticated users can see unpublished adverts.
+    return "staff" if request.user.is_authenticated else "public"
+
+
+def list_cache_key(request: Request, prefix: str = "list") -> str:
+    """Key of a response built from the whole listing, such as a page or facets"""
+    return build_list_cache_key(request, prefix, get_version(LIST_VERSION_KEY))
+
+
+async def alist_cache_key(request: Request, prefix: str = "list") -> str:
+    return build_list_cache_key(request, prefix, await aget_version(LIST_VERSION_KEY))
+
+
+def build_list_cache_key(request: Request, prefix: str, version: str) -> str:
+    url_digest = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f"jobadvert:{prefix}:{version}:{get_audience(request)}:{url_digest}"
+
+
+def detail_cache_key(request: Request, advert_id) -> str:
+    version_key = advert_version_key(advert_id)
+    return build_detail_cache_key(request, version_key, get_version(version_key))
+
+
+async def adetail_cache_key(request: Request, advert_id) -> str:
+    version_key = advert_version_key(advert_id)
+    version = await aget_version(version_key)
+    return build_detail_cache_key(request, version_key, version)
+
+
+def build_detail_cache_key(request: Request, version_key: str, version: str) -> str:
+    return f"jobadvert:detail:{version}:{get_audience(request)}:{version_key}"
+
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the state a response was rendered from"""
+    state = ":".join(str(part) for part in parts)
+    return '"%s"' % hashlib.sha1(state.encode()).hexdigest()
+
+
+def cached_response(
+    request: Request,
+    key: str,
+    get_validators: Callable[[], tuple[str, datetime | None]],
+    build_response: Callable[[], Response],
+):
+    """
+    Serve the response cached under ``key``, building and caching it with
+    ``build_response`` on a miss.
+
+    ``get_validators`` returns the ETag and last modification time of the
+    underlying data. It is only called on a miss, and conditional requests
+    that match it get a 304 before ``build_response`` runs. Both read from
+    the primary database, never from the replica.
+    """
+    job_cache = get_cache()
+    entry = job_cache.get(key)
+    is_miss = entry is None
+    record_cache_lookup("response", hit=not is_miss)
+    if is_miss:
+        with use_replica(False):
+            entry = new_entry(*get_validators())
+
+    not_modified = get_not_modified(request, entry)
+    if not_modified is not None:
+        return not_modified
+
+    if is_miss:
+        with use_replica(False):
+            response = build_response()
+        if response.status_code != 200:
+            return response
+        entry["data"] = response.data
+        job_cache.set(key, entry, settings.JOB_CACHE_TIMEOUT)
+    return entry_response(entry)
+
+
+async def acached_response(
+    request: Request,
+    key: str,
+    get_validators: Callable[[], Awaitable[tuple[str, datetime | None]]],
+    build_response: Callable[[], Awaitable[Response]],
+):
+    """``cached_response()`` for async views, taking coroutine functions"""
+    job_cache = get_cache()
+    entry = await job_cache.aget(key)
+    is_miss = entry is None
+    record_cache_lookup("response", hit=not is_miss)
+    if is_miss:
+        with use_replica(False):
+            entry = new_entry(*await get_validators())
+
+    not_modified = get_not_modified(request, entry)
+    if not_modified is not None:
+        return not_modified
+
+    if is_miss:
+        with use_replica(False):
+            response = await build_response()
+        if response.status_code != 200:
+            return response
+        entry["data"] = response.data
+        await job_cache.aset(key, entry, settings.JOB_CACHE_TIMEOUT)
+    return entry_response(entry)
+
+
+def new_entry(etag: str, last_modified: datetime | None) -> dict:
+    return {
+        "etag": etag,
+        "last_modified": last_modified and int(last_modified.timestamp()),
+    }
+
+
+def get_not_modified(request: Request, entry: dict):
+    not_modified = get_conditional_response(
+        request, etag=entry["etag"], last_modified=entry["last_modified"]
+    )
+    if not_modified is not None:
+        not_modified["ETag"] = entry["etag"]
+    return not_modified
+
+
+def entry_response(entry: dict) -> Response:
+    response = Response(entry["data"])
+    response["ETag"] = entry["etag"]
+    if entry["last_modified"] is not None:
+        response["Last-Modified"] = http_date(entry["last_modified"])
+    return response
@@ -17,3 +17,20 @@ YearOfExperience = [
     ("5-6", "5-6"),
     ("7-above", "7-above"),
 ]
+
+ExportKind = [
+    ("applications", "Applications to an advert"),
+    ("company_adverts", "Adverts of a company"),
+]
+
+ExportFormat = [
+    ("csv", "CSV"),
+    ("ndjson", "NDJSON"),
+]
+
+ExportStatus = [
+    ("pending", "Pending"),
+    ("running", "Running"),
+    ("completed", "Completed"),
+    ("failed", "Failed"),
+]
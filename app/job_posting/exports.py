@@ -0,0 +1,162 @@
+import csv
+import gzip
+import json
+import os
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import DataExport, JobAdvert, JobApplication
+
+# Columns of an exported job application, in order
+APPLICATION_EXPORT_FIELDS = [
+    "id",
+    "job_advert_id",
+    "created_at",
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "linkedin_url",
+    "github_url",
+    "website",
+    "experience_years",
+    "cover_letter",
+]
+
+# Columns of an exported job advert, in order
+ADVERT_EXPORT_FIELDS = [
+    "id",
+    "created_at",
+    "title",
+    "company_name",
+    "employment_type",
+    "experience_level",
+    "location",
+    "is_published",
+    "applications_count",
+    "description",
+]
+
+
+class Echo:
+    """A file-like object that hands back what is written to it"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+# Leading characters that make spreadsheets evaluate a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def escape_formula(value):
+    """Quote text that a spreadsheet would otherwise run as a formula"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(fields: list[str], rows: Iterable[tuple]) -> Iterator[str]:
+    """CSV lines of ``rows``, with applicant-controlled text safe to open"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([escape_formula(value) for value in row])
+
+
+def iter_ndjson(fields: list[str], rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv"),
+    "ndjson": (iter_ndjson, "application/x-ndjson"),
+}
+
+
+def export_rows(queryset, fields: list[str], chunk_size: int) -> Iterator[tuple]:
+    """Stream ``fields`` of ``queryset`` through a server-side cursor"""
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+async def aiter_export(content: Iterator[str], chunk_size: int) -> AsyncIterator[str]:
+    """
+    Serve a rendered export to an ASGI server, which would otherwise read a
+    sync iterator into memory before sending any of it. ``chunk_size`` lines
+    are rendered per trip to the thread that holds the database cursor.
+    """
+    next_chunk = sync_to_async(lambda: list(islice(content, chunk_size)))
+    while chunk := await next_chunk():
+        for line in chunk:
+            yield line
+
+
+def export_source(data_export: DataExport):
+    """The ordered queryset and columns a ``DataExport`` covers"""
+    if data_export.kind == "applications":
+        queryset = JobApplication.objects.filter(job_advert=data_export.job_advert_id)
+        fields = APPLICATION_EXPORT_FIELDS
+    else:
+        queryset = JobAdvert.objects.filter(company_name=data_export.company_name)
+        fields = ADVERT_EXPORT_FIELDS
+    return queryset.order_by("created_at", "id"), fields
+
+
+def write_export(data_export: DataExport) -> None:
+    """
+    Write a ``DataExport`` to local storage, ``EXPORT_CHUNK_SIZE`` rows at a
+    time, recording how many rows have been written after every chunk.
+
+    Rows go to a ``.part`` file that is only renamed into place once the
+    export is complete, so a download never sees a half-written file.
+    """
+    queryset, fields = export_source(data_export)
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    render, _ = EXPORT_FORMATS[data_export.export_format]
+    exports = DataExport.objects.filter(id=data_export.id)
+
+    data_export.status = "running"
+    data_export.rows_written = 0
+    data_export.total_rows = queryset.count()
+    exports.update(status="running", rows_written=0, total_rows=data_export.total_rows)
+
+    def tracked(rows: Iterable[tuple]) -> Iterator[tuple]:
+        for row in rows:
+            yield row
+            data_export.rows_written += 1
+            if data_export.rows_written % chunk_size == 0:
+                exports.update(rows_written=data_export.rows_written)
+
+    storage = data_export.file.storage
+    path = storage.path(data_export.filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    opener = gzip.open if data_export.compress else open
+    try:
+        with opener(path + ".part", "wt", encoding="utf-8", newline="") as file:
+            rows = tracked(export_rows(queryset, fields, chunk_size))
+            for line in render(fields, rows):
+                file.write(line)
+        os.replace(path + ".part", path)
+    except BaseException:
+        if os.path.exists(path + ".part"):
+            os.remove(path + ".part")
+        raise
+
+    data_export.file.name = data_export.filename
+    data_export.status = "completed"
+    data_export.completed_at = timezone.now()
+    data_export.save(
+        update_fields=[
+            "file",
+            "status",
+            "rows_written",
+            "completed_at",
+            "updated_at",
+        ]
+    )
@@ -0,0 +1,148 @@
+import django_filters
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Count, F, Q
+from rest_framework.filters import BaseFilterBackend
+
+from .enums import EmploymentType, ExperienceLevel
+from .models import JobAdvert
+
+# Facets with a fixed set of values, counted together in one query
+CHOICE_FACETS = {
+    "employment_type": EmploymentType,
+    "experience_level": ExperienceLevel,
+}
+# How each facet's selected value filters adverts, as in JobAdvertFilter
+FACET_LOOKUPS = {
+    "employment_type": "employment_type",
+    "experience_level": "experience_level",
+    "location": "location__iexact",
+}
+LOCATION_FACET_LIMIT = 50
+
+SEARCH_CONFIG = "english"
+
+
+def search_adverts(queryset, terms: str):
+    """Filter ``queryset`` to adverts matching ``terms``, most relevant first"""
+    query = SearchQuery(terms, config=SEARCH_CONFIG, search_type="websearch")
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", *ordering)
+    )
+
+
+class JobAdvertSearchFilter(BaseFilterBackend):
+    """
+    Full-text search over an advert's title, company name, location and
+    description, ranked by relevance.
+
+    Matches use the GIN index on ``JobAdvert.search_vector``; ties in rank
+    keep the queryset's existing ordering.
+    """
+
+    search_param = "q"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms:
+            return queryset
+        return search_adverts(queryset, terms)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Full-text search terms.",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+class JobAdvertFilter(django_filters.FilterSet):
+    """
+    Structured advert filters. Each one is backed by a partial index over
+    published adverts (see ``JobAdvert.Meta.indexes``).
+    """
+
+    location = django_filters.CharFilter(lookup_expr="iexact")
+    created_after = django_filters.IsoDateTimeFilter(
+        field_name="created_at", lookup_expr="gte"
+    )
+    created_before = django_filters.IsoDateTimeFilter(
+        field_name="created_at", lookup_expr="lt"
+    )
+
+    class Meta:
+        model = JobAdvert
+        fields = ["employment_type", "experience_level", "location", "is_published"]
+
+
+def split_facet_filters(filterset: JobAdvertFilter):
+    """
+    Split a valid, bound ``filterset`` into its queryset filtered by every
+    filter but the facets, and the value selected for each facet
+    """
+    data = filterset.data.copy()
+    for field in FACET_LOOKUPS:
+        data.pop(field, None)
+    queryset = type(filterset)(data, queryset=filterset.queryset).qs
+    cleaned_data = filterset.form.cleaned_data
+    selected = {
+        field: cleaned_data[field] for field in FACET_LOOKUPS if cleaned_data.get(field)
+    }
+    return queryset, selected
+
+
+def count_facets(queryset, selected: dict | None = None) -> dict:
+    """
+    Count the adverts in ``queryset`` per employment type, experience level
+    and location, in two queries.
+
+    Facets are disjunctive: each one is counted under the ``selected``
+    values of the other facets but not its own, so that choosing a value
+    still shows how many adverts each alternative has.
+
+    Choice facets are counted with one conditional aggregate; locations,
+    which are free text, with one GROUP BY returning the most common
+    ``LOCATION_FACET_LIMIT`` values.
+    """
+    selected = selected or {}
+
+    def other_facets(facet: str) -> Q:
+        condition = Q()
+        for field, value in selected.items():
+            if field != facet:
+                condition &= Q(**{FACET_LOOKUPS[field]: value})
+        return condition
+
+    queryset = queryset.order_by()
+    aggregates = {
+        f"{field}_{index}": Count(
+            "id", filter=Q(**{field: value}) & other_facets(field)
+        )
+        for field, choices in CHOICE_FACETS.items()
+        for index, (value, _) in enumerate(choices)
+    }
+    counts = queryset.aggregate(**aggregates)
+
+    facets = {
+        field: [
+            {"value": value, "count": counts[f"{field}_{index}"]}
+            for index, (value, _) in enumerate(choices)
+        ]
+        for field, choices in CHOICE_FACETS.items()
+    }
+    locations = (
+        queryset.filter(other_facets("location"))
+        .values("location")
+        .annotate(count=Count("id"))
+        .order_by("-count", "location")[:LOCATION_FACET_LIMIT]
+    )
+    facets["location"] = [
+        {"value": row["location"], "count": row["count"]} for row in locations
+    ]
+    return facets
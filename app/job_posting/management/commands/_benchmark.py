@@ -0,0 +1,228 @@
+"""Helpers shared by the bench_* management commands"""
+
+import http.client
+import itertools
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+from job_posting.async_views import ASYNC_VIEWS
+from job_posting.enums import EmploymentType, ExperienceLevel
+from job_posting.models import JobAdvert
+
+TITLES = [
+    "Backend Engineer",
+    "Frontend Developer",
+    "Python Developer",
+    "Data Scientist",
+    "Product Manager",
+    "DevOps Engineer",
+    "Accountant",
+    "Marketing Lead",
+    "Sales Executive",
+    "UX Designer",
+]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne"]
+LOCATIONS = ["Lagos", "Abuja", "Nairobi", "Accra", "London", "Berlin", "Remote"]
+WORDS = (
+    "build maintain scalable services team customers data platform cloud "
+    "design ship features mentor review code product growth support "
+    "analytics reporting pipeline security testing deploy monitor"
+).split()
+
+
+ASYNC_ACTIONS = ",".join(action for action, *_ in ASYNC_VIEWS.values())
+
+# Server mode -> (command line, JOB_ASYNC_VIEWS)
+SERVERS = {
+    "wsgi": (
+        [
+            "gunicorn",
+            "core.wsgi:application",
+            "--worker-class",
+            "gthread",
+            "--workers",
+            "{workers}",
+            "--threads",
+            "{threads}",
+            "--bind",
+            "127.0.0.1:{port}",
+        ],
+        "",
+    ),
+    "asgi-sync": (
+        [
+            "uvicorn",
+            "core.asgi:application",
+            "--workers",
+            "{workers}",
+            "--port",
+            "{port}",
+            "--no-access-log",
+        ],
+        "",
+    ),
+    "asgi-async": (
+        [
+            "uvicorn",
+            "core.asgi:application",
+            "--workers",
+            "{workers}",
+            "--port",
+            "{port}",
+            "--no-access-log",
+        ],
+        ASYNC_ACTIONS,
+    ),
+}
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``"""
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def time_calls(func: Callable[[], object], repeat: int) -> list[float]:
+    """Call ``func`` ``repeat`` times and return each duration in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "count": len(samples),
+        "mean": sum(samples) / len(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+    }
+
+
+def format_summary(name: str, samples: list[float]) -> str:
+    summary = summarize(samples)
+    return (
+        f"{name:<40} n={summary['count']:<6} mean={summary['mean']:9.2f}ms "
+        f"p50={summary['p50']:9.2f}ms p95={summary['p95']:9.2f}ms "
+        f"p99={summary['p99']:9.2f}ms"
+    )
+
+
+def build_adverts(count: int, rng: random.Random) -> list[JobAdvert]:
+    """Unsaved adverts with varied, searchable text"""
+    return [
+        JobAdvert(
+            title=rng.choice(TITLES),
+            company_name=rng.choice(COMPANIES),
+            employment_type=rng.choice(EmploymentType)[0],
+            experience_level=rng.choice(ExperienceLevel)[0],
+            description=" ".join(rng.choices(WORDS, k=40)),
+            location=rng.choice(LOCATIONS),
+            is_published=rng.random() < 0.9,
+        )
+        for _ in range(count)
+    ]
+
+
+def ensure_adverts(total: int, seed: int, batch_size: int = 5000, stdout=None) -> int:
+    """Top the advert table up to ``total`` rows; returns how many were added"""
+    missing = total - JobAdvert.objects.count()
+    rng = random.Random(seed)
+    added = 0
+    while added < missing:
+        batch = build_adverts(min(batch_size, missing - added), rng)
+        JobAdvert.objects.bulk_create(batch)
+        added += len(batch)
+        if stdout is not None:
+            stdout.write(f"Seeded {added}/{missing} adverts", ending="\r")
+    if stdout is not None and added:
+        stdout.write("")
+    return added
+
+
+def wait_for_port(port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise CommandError(f"Server did not start listening on port {port}")
+
+
+@contextmanager
+def running_server(
+    name: str, port: int, workers: int, threads: int, env=None, verbose=False
+):
+    """Run server mode ``name`` of ``SERVERS`` against the configured database"""
+    command, async_views = SERVERS[name]
+    if shutil.which(command[0]) is None:
+        raise CommandError(f"{command[0]} is required for {name}")
+    command = [
+        part.format(port=port, workers=workers, threads=threads) for part in command
+    ]
+    server = subprocess.Popen(
+        command,
+        cwd=settings.ROOT_DIR,
+        env={**os.environ, **(env or {}), "JOB_ASYNC_VIEWS": async_views},
+        stdout=subprocess.DEVNULL,
+        stderr=sys.stderr if verbose else subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port, timeout=30)
+        yield server
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_load(port: int, make_request: Callable, total: int, concurrency: int):
+    """
+    Send ``total`` requests over ``concurrency`` keep-alive connections.
+    ``make_request(index)`` returns the method, path, body and headers of
+    each one. Returns each latency in milliseconds, the number of responses
+    outside 2xx and the elapsed seconds.
+    """
+    counter = itertools.count()
+    lock = threading.Lock()
+    samples, errors = [], []
+
+    def worker():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        while (index := next(counter)) < total:
+            method, path, body, headers = make_request(index)
+            start = time.perf_counter()
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            response.read()
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                samples.append(elapsed)
+                if not 200 <= response.status < 300:
+                    errors.append(response.status)
+        connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, len(errors), time.perf_counter() - start
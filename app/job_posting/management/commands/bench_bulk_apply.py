@@ -0,0 +1,92 @@
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from job_posting.models import JobAdvert, User
+
+from ._benchmark import build_adverts
+
+
+def application_rows(adverts: list[JobAdvert], count: int, rng: random.Random):
+    return [
+        {
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "email": f"bench-{uuid.uuid4().hex}@example.com",
+            "phone": "+2348000000000",
+            "linkedin_url": "https://www.linkedin.com/in/ada",
+            "github_url": "https://github.com/ada",
+            "website": "https://ada.dev",
+            "experience_years": "3-4",
+            "cover_letter": "Hello",
+            "job_advert": str(rng.choice(adverts).id),
+        }
+        for _ in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare application throughput of the single-item apply endpoint with "
+        "the bulk apply endpoint, in process. Creates and then deletes its own "
+        "adverts in the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--applications", type=int, default=2000)
+        parser.add_argument("--adverts", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        adverts = JobAdvert.objects.bulk_create(
+            build_adverts(options["adverts"], rng), batch_size=1000
+        )
+        for advert in adverts:
+            advert.is_published = True
+        JobAdvert.objects.bulk_update(adverts, ["is_published"])
+        user = User.objects.create_user(
+            email=f"bench-{uuid.uuid4().hex}@example.com", password=None
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        try:
+            count = options["applications"]
+            single_rows = application_rows(adverts, count, rng)
+            start = time.perf_counter()
+            for row in single_rows:
+                url = reverse(
+                    "job_posting:jobadvert-apply", kwargs={"pk": row["job_advert"]}
+                )
+                client.post(url, row, format="json")
+            single_seconds = time.perf_counter() - start
+
+            bulk_rows = application_rows(adverts, count, rng)
+            with override_settings(BULK_APPLY_BATCH_SIZE=options["batch_size"]):
+                start = time.perf_counter()
+                response = client.post(
+                    reverse("job_posting:jobadvert-bulk-apply"),
+                    bulk_rows,
+                    format="json",
+                )
+                bulk_seconds = time.perf_counter() - start
+            assert response.data["created"] == count, response.data
+
+            self.stdout.write(
+                f"single apply: {count / single_seconds:10.1f} applications/s "
+                f"({single_seconds:.2f}s)"
+            )
+            self.stdout.write(
+                f"bulk apply:   {count / bulk_seconds:10.1f} applications/s "
+                f"({bulk_seconds:.2f}s, batch size {options['batch_size']})"
+            )
+        finally:
+            JobAdvert.objects.filter(id__in=[advert.id for advert in adverts]).delete()
+            user.delete()
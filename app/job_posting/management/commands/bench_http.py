@@ -0,0 +1,96 @@
+from django.core.management.base import BaseCommand
+
+from ._benchmark import (
+    SERVERS,
+    ensure_adverts,
+    format_summary,
+    run_load,
+    running_server,
+)
+
+# Database connection mode -> environment
+CONNECTION_MODES = {
+    "per-request": {"DATABASE_CONN_MAX_AGE": "0", "DATABASE_POOL": "0"},
+    "persistent": {"DATABASE_CONN_MAX_AGE": "60", "DATABASE_POOL": "0"},
+    "pool": {"DATABASE_CONN_MAX_AGE": "0", "DATABASE_POOL": "1"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the job board over HTTP at a fixed concurrency under sync "
+        "WSGI (gunicorn), sync views under ASGI (uvicorn) and native async views "
+        "under ASGI. Starts each server against the configured database, which "
+        "is seeded with synthetic adverts when needed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--server",
+            action="append",
+            choices=list(SERVERS),
+            help="Server mode to measure; may be repeated. Defaults to all.",
+        )
+        parser.add_argument(
+            "--db-connections",
+            action="append",
+            choices=list(CONNECTION_MODES),
+            help=(
+                "Database connection handling to measure each server with; may "
+                "be repeated. Defaults to the configured one."
+            ),
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            help=(
+                "Path to request; may be repeated. {n} is replaced by 1-50 in "
+                "turn. Defaults to pages of the advert list."
+            ),
+        )
+        parser.add_argument("--requests", type=int, default=5000)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--threads", type=int, default=32)
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--adverts", type=int, default=10000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        paths = options["path"] or ["/api/v1/posting/?page={n}"]
+
+        def make_request(index: int):
+            path = paths[index % len(paths)].format(n=index % 50 + 1)
+            return "GET", path, None, {}
+
+        ensure_adverts(options["adverts"], options["seed"], stdout=self.stdout)
+
+        runs = [
+            (name, mode)
+            for name in options["server"] or SERVERS
+            for mode in options["db_connections"] or [None]
+        ]
+        for name, mode in runs:
+            with running_server(
+                name,
+                options["port"],
+                options["workers"],
+                options["threads"],
+                env=CONNECTION_MODES.get(mode, {}),
+                verbose=options["verbosity"] > 1,
+            ):
+                # Warm up connections, caches and lazily imported modules.
+                run_load(options["port"], make_request, 200, options["concurrency"])
+                samples, errors, seconds = run_load(
+                    options["port"],
+                    make_request,
+                    options["requests"],
+                    options["concurrency"],
+                )
+
+            label = f"{name} {mode}" if mode else name
+            self.stdout.write(format_summary(label, samples))
+            self.stdout.write(
+                f"{'':<40} {len(samples) / seconds:.1f} requests/s "
+                f"at concurrency {options['concurrency']}, {errors} errors"
+            )
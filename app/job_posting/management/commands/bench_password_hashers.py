@@ -0,0 +1,66 @@
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from job_posting.models import User
+
+from ._benchmark import format_summary, summarize, time_calls
+
+PASSWORD = "BenchPass@1"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure signup and login latency, and single-core requests per second, "
+        "under each password hasher policy with the configured costs. Creates "
+        "and then deletes its own users in the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--policy",
+            action="append",
+            choices=list(settings.PASSWORD_HASHER_POLICIES),
+            help="Policy to measure; may be repeated. Defaults to all of them.",
+        )
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        client = APIClient()
+        emails = []
+        try:
+            for policy in options["policy"] or settings.PASSWORD_HASHER_POLICIES:
+                preferred = settings.PASSWORD_HASHER_POLICIES[policy]
+                hashers = [preferred] + [
+                    hasher
+                    for hasher in settings.PASSWORD_HASHERS
+                    if hasher != preferred
+                ]
+                with override_settings(PASSWORD_HASHERS=hashers):
+
+                    def signup():
+                        emails.append(f"bench-{uuid.uuid4().hex}@example.com")
+                        data = {"email": emails[-1], "password": PASSWORD}
+                        response = client.post(reverse("user:user-list"), data)
+                        assert response.status_code == 200, response.data
+
+                    def login():
+                        data = {"email": emails[0], "password": PASSWORD}
+                        response = client.post(reverse("auth:auth-login"), data)
+                        assert response.status_code == 200, response.data
+
+                    for name, func in [("signup", signup), ("login", login)]:
+                        samples = time_calls(func, options["repeat"])
+                        self.stdout.write(format_summary(f"{policy} {name}", samples))
+                        self.stdout.write(
+                            f"{'':<40} "
+                            f"{1000 / summarize(samples)['mean']:.1f} requests/s/core"
+                        )
+                User.objects.filter(email__in=emails).delete()
+                emails.clear()
+        finally:
+            User.objects.filter(email__in=emails).delete()
@@ -0,0 +1,256 @@
+import itertools
+import json
+import math
+import random
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from job_posting.models import JobAdvert, JobApplication, User, unexpired
+
+from ._benchmark import LOCATIONS, SERVERS, WORDS, run_load, running_server, summarize
+from .seed_jobboard import USER_EMAIL, USER_PASSWORD
+
+# Rows at --scale 1
+FULL_SCALE = {"adverts": 100_000, "applications": 10_000_000, "users": 1_000}
+DEFAULT_BASELINE = Path(settings.ROOT_DIR) / "benchmarks" / "baseline.json"
+# Adverts that take most applications and that recruiters page through
+HOT_ADVERTS = 20
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+class Scenarios:
+    """Request builders of the scripted scenarios, by name"""
+
+    def __init__(self, rng: random.Random, users: int):
+        self.rng = rng
+        self.run_id = uuid.uuid4().hex[:8]
+        self.advert_ids = [
+            str(advert_id)
+            for advert_id in JobAdvert.objects.filter(is_published=True)
+            .order_by("?")
+            .values_list("id", flat=True)[:1000]
+        ]
+        self.hot_advert_ids = [
+            str(advert_id)
+            for advert_id in JobAdvert.objects.filter(is_published=True)
+            .order_by("-applications_count")
+            .values_list("id", flat=True)[:HOT_ADVERTS]
+        ]
+        if not self.advert_ids:
+            raise CommandError("No published adverts to benchmark against")
+        listed = JobAdvert.objects.filter(unexpired(), is_published=True).count()
+        self.last_page = max(
+            math.ceil(listed / settings.REST_FRAMEWORK["PAGE_SIZE"]), 1
+        )
+        # Warm-up runs reuse the indexes, so applicants are numbered apart.
+        self.applicants = itertools.count()
+        self.users = users
+        recruiter = User.objects.get(email=USER_EMAIL.format(0))
+        token, _ = Token.objects.get_or_create(user=recruiter)
+        self.recruiter_headers = {"Authorization": f"Token {token.key}"}
+
+    def list(self, index: int):
+        """Anonymous visitors paging through the board"""
+        page = min(int(self.rng.paretovariate(1.5)), self.last_page)
+        return "GET", f"/api/v1/posting/?page={page}", None, {}
+
+    def search(self, index: int):
+        """Anonymous searches, filtered by location half of the time"""
+        path = f"/api/v1/posting/?q={self.rng.choice(WORDS)}"
+        if self.rng.random() < 0.5:
+            path += f"&location={self.rng.choice(LOCATIONS)}"
+        return "GET", path, None, {}
+
+    def detail(self, index: int):
+        return "GET", f"/api/v1/posting/{self.rng.choice(self.advert_ids)}/", None, {}
+
+    def apply(self, index: int):
+        """Bursts of applications to the most popular adverts"""
+        advert_id = self.rng.choice(self.hot_advert_ids)
+        body = {
+            "first_name": "Ada",
+            "last_name": "Lovelace",
+            "email": f"burst-{self.run_id}-{next(self.applicants)}@example.com",
+            "phone": "+2348000000000",
+            "linkedin_url": "https://www.linkedin.com/in/ada",
+            "github_url": "https://github.com/ada",
+            "experience_years": "3-4",
+        }
+        path = f"/api/v1/posting/{advert_id}/apply/"
+        return "POST", path, json.dumps(body), JSON_HEADERS
+
+    def applications(self, index: int):
+        """A recruiter paging through the applications of popular adverts"""
+        advert_id = self.hot_advert_ids[index % len(self.hot_advert_ids)]
+        page = index // len(self.hot_advert_ids) % 20 + 1
+        path = f"/api/v1/posting/{advert_id}/applications/?page={page}"
+        return "GET", path, None, self.recruiter_headers
+
+    def login(self, index: int):
+        """Many users logging in at once"""
+        body = {
+            "email": USER_EMAIL.format(index % self.users),
+            "password": USER_PASSWORD,
+        }
+        return "POST", "/api/v1/auth/login/", json.dumps(body), JSON_HEADERS
+
+
+SCENARIOS = ["list", "search", "detail", "apply", "applications", "login"]
+# Each login hashes a password, so the storm sends a tenth of --requests.
+REQUEST_SHARES = {"login": 0.1}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Describe each scenario that had failed requests, or is slower than
+    ``baseline`` by over ``tolerance``. Failures count on their own, as
+    requests that fail fast would otherwise pass for faster ones.
+    """
+    regressions = []
+    for name, result in results.items():
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} failed requests")
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        if result["p95"] > before["p95"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: p95 {before['p95']:.2f}ms -> {result['p95']:.2f}ms"
+            )
+        if result["throughput"] < before["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {before['throughput']:.1f} -> "
+                f"{result['throughput']:.1f} requests/s"
+            )
+    return regressions
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed the configured database with adverts, skewed applications and "
+        "users (100k, 10M and 1k at --scale 1) through seed_jobboard, then run "
+        "scripted scenarios against a local server and compare their "
+        "throughput and latency with a stored baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=0.01)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=SCENARIOS,
+            help="Scenario to run; may be repeated. Defaults to all.",
+        )
+        parser.add_argument("--server", choices=list(SERVERS), default="wsgi")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--seed-processes", type=int, default=1)
+        parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Store the results as the new baseline instead of comparing.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed share of p95 growth or throughput loss (default 0.25).",
+        )
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        rows = {name: max(int(count * scale), 1) for name, count in FULL_SCALE.items()}
+        call_command(
+            "seed_jobboard",
+            **rows,
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            processes=options["seed_processes"],
+            stdout=self.stdout,
+        )
+        rng = random.Random(options["seed"])
+        self.stdout.write(
+            f"Data: {JobAdvert.objects.count()} adverts, "
+            f"{JobApplication.objects.count()} applications, {rows['users']} users"
+        )
+
+        scenarios = Scenarios(rng, rows["users"])
+        results = {}
+        with running_server(
+            options["server"],
+            options["port"],
+            options["workers"],
+            options["threads"],
+            verbose=options["verbosity"] > 1,
+        ):
+            for name in options["scenario"] or SCENARIOS:
+                make_request = getattr(scenarios, name)
+                requests = max(
+                    int(options["requests"] * REQUEST_SHARES.get(name, 1)), 1
+                )
+                # Warm up connections, caches and lazily imported modules.
+                run_load(options["port"], make_request, 100, options["concurrency"])
+                samples, errors, seconds = run_load(
+                    options["port"], make_request, requests, options["concurrency"]
+                )
+                results[name] = {
+                    **summarize(samples),
+                    "errors": errors,
+                    "throughput": len(samples) / seconds,
+                }
+                self.stdout.write(
+                    f"{name:<14} {results[name]['throughput']:8.1f} requests/s "
+                    f"p50={results[name]['p50']:8.2f}ms "
+                    f"p95={results[name]['p95']:8.2f}ms "
+                    f"p99={results[name]['p99']:8.2f}ms {errors} errors"
+                )
+
+        config = {
+            key: options[key]
+            for key in ["scale", "server", "requests", "concurrency", "workers"]
+        }
+        if options["save_baseline"]:
+            failed = [name for name, result in results.items() if result["errors"]]
+            if failed:
+                raise CommandError(
+                    f"Not saving a baseline with failed requests: {', '.join(failed)}"
+                )
+            options["baseline"].parent.mkdir(parents=True, exist_ok=True)
+            options["baseline"].write_text(
+                json.dumps({"config": config, "scenarios": results}, indent=2) + "\n"
+            )
+            self.stdout.write(f"Saved the baseline to {options['baseline']}")
+            return
+
+        if not options["baseline"].exists():
+            self.stdout.write("No baseline to compare with; use --save-baseline.")
+            return
+        baseline = json.loads(options["baseline"].read_text())
+        if baseline["config"] != config:
+            self.stdout.write(
+                f"The baseline was measured with {baseline['config']}; "
+                "the comparison is only indicative."
+            )
+        for name, result in results.items():
+            before = baseline["scenarios"].get(name)
+            if before:
+                self.stdout.write(
+                    f"{name:<14} throughput "
+                    f"{(result['throughput'] / before['throughput'] - 1):+7.1%} "
+                    f"p95 {(result['p95'] / before['p95'] - 1):+7.1%}"
+                )
+        regressions = compare(results, baseline, options["tolerance"])
+        if regressions:
+            raise CommandError("Regressions:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from job_posting.filters import search_adverts
+from job_posting.models import JobAdvert
+
+from ._benchmark import ensure_adverts, format_summary, time_calls
+
+SEARCH_FIELDS = ["title", "company_name", "description", "location"]
+TERMS = ["python", "backend engineer", "lagos", "analytics pipeline", "designer"]
+
+
+def icontains_search(queryset, terms: str):
+    """The substring scan full-text search replaces"""
+    for term in terms.split():
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f"{field}__icontains": term})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare full-text advert search with icontains scans. Seeds adverts "
+        "into the configured database when there are fewer than --adverts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--adverts", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--page-size", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        ensure_adverts(options["adverts"], options["seed"], stdout=self.stdout)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {JobAdvert._meta.db_table}")
+
+        published = JobAdvert.objects.filter(is_published=True).order_by(
+            "-applications_count", "-created_at"
+        )
+        page_size = options["page_size"]
+        strategies = {
+            "full-text": search_adverts,
+            "icontains": icontains_search,
+        }
+        self.stdout.write(f"{JobAdvert.objects.count()} adverts")
+        for terms in TERMS:
+            for name, search in strategies.items():
+                queryset = search(published, terms).values_list("id", flat=True)
+
+                def run_page():
+                    # What one list request does: count, then fetch a page.
+                    queryset.count()
+                    list(queryset[:page_size])
+
+                samples = time_calls(run_page, options["repeat"])
+                self.stdout.write(format_summary(f"{name} {terms!r}", samples))
@@ -0,0 +1,55 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from job_posting.authentication import CachedTokenAuthentication, forget_tokens
+from job_posting.models import User
+
+from ._benchmark import format_summary, time_calls
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare database queries and latency per request of DRF's token "
+        "authentication with the cached token authentication. Creates and then "
+        "deletes its own user in the configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(
+            email=f"bench-{uuid.uuid4().hex}@example.com", password=None
+        )
+        token = Token.objects.create(user=user)
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Token {token.key}")
+        repeat = options["repeat"]
+
+        try:
+            forget_tokens(token.key)
+            for authentication_class in [
+                TokenAuthentication,
+                CachedTokenAuthentication,
+            ]:
+                authenticator = authentication_class()
+
+                def authenticate():
+                    assert authenticator.authenticate(Request(request))[0] == user
+
+                with CaptureQueriesContext(connection) as context:
+                    samples = time_calls(authenticate, repeat)
+                self.stdout.write(
+                    format_summary(authentication_class.__name__, samples)
+                )
+                self.stdout.write(
+                    f"{'':<40} queries/request={len(context) / repeat:.3f}"
+                )
+        finally:
+            user.delete()
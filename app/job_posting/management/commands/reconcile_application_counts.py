@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from job_posting.cache import invalidate_adverts
+from job_posting.models import JobAdvert, JobApplication
+
+
+def actual_applications_count():
+    """Correlated subquery counting the applications of the outer advert"""
+    applications = (
+        JobApplication.objects.filter(job_advert=OuterRef("pk"))
+        .order_by()
+        .values("job_advert")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(applications), 0)
+
+
+class Command(BaseCommand):
+    help = "Recompute JobAdvert.applications_count where it has drifted"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of adverts checked per UPDATE statement.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted adverts without fixing them.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size: int = options["batch_size"]
+        advert_ids = JobAdvert.objects.order_by("pk").values_list("pk", flat=True)
+
+        batch, fixed = [], 0
+        for advert_id in advert_ids.iterator(chunk_size=batch_size):
+            batch.append(advert_id)
+            if len(batch) == batch_size:
+                fixed += self.reconcile(batch, options["dry_run"])
+                batch = []
+        if batch:
+            fixed += self.reconcile(batch, options["dry_run"])
+
+        verb = "Found" if options["dry_run"] else "Reconciled"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {fixed} drifted advert(s)."))
+
+    def reconcile(self, advert_ids: list, dry_run: bool) -> int:
+        drifted = (
+            JobAdvert.objects.filter(pk__in=advert_ids)
+            .annotate(actual=actual_applications_count())
+            .exclude(applications_count=F("actual"))
+        )
+        if dry_run:
+            return drifted.count()
+        drifted_ids = list(drifted.values_list("pk", flat=True))
+        if not drifted_ids:
+            return 0
+        fixed = JobAdvert.objects.filter(pk__in=drifted_ids).update(
+            applications_count=actual_applications_count(), updated_at=timezone.now()
+        )
+        # update() sends no signals, so the cached responses are dropped here.
+        invalidate_adverts(*drifted_ids)
+        return fixed
@@ -0,0 +1,288 @@
+import multiprocessing
+import random
+import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from operator import attrgetter
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.db.models import BigIntegerField, Max
+from django.db.models.functions import Cast, Length, Substr
+from django.utils import timezone
+
+from job_posting.enums import EmploymentType, ExperienceLevel, YearOfExperience
+from job_posting.models import JobAdvert, JobApplication, User
+
+from ._benchmark import COMPANIES, LOCATIONS, TITLES, WORDS
+
+USER_EMAIL = "user{}@example.com"
+APPLICANT_EMAIL = "applicant{}@example.com"
+USER_PASSWORD = "SeedPass@1"
+FIRST_NAMES = ["Ada", "Chinedu", "Amina", "Tunde", "Grace", "Kofi", "Zainab", "Femi"]
+LAST_NAMES = ["Okafor", "Mensah", "Bello", "Adeyemi", "Kamau", "Osei", "Eze", "Ali"]
+METHODS = ["auto", "copy", "bulk-create"]
+
+
+def zipf_weights(count: int, exponent: float) -> list[float]:
+    """Cumulative weights that give a few items most picks and a long tail"""
+    total, cumulative = 0.0, []
+    for rank in range(1, count + 1):
+        total += 1 / rank**exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def copy_available() -> bool:
+    return connection.vendor == "postgresql" and is_psycopg3
+
+
+def next_position(model, email: str) -> int:
+    """
+    The position after the highest among ``model``'s rows whose email follows
+    the seeded ``email`` pattern, so that other rows shift no positions.
+    """
+    prefix, suffix = email.split("{}")
+    seeded = model.objects.filter(
+        email__regex=f"^{re.escape(prefix)}[0-9]+{re.escape(suffix)}$"
+    )
+    position = Substr(
+        "email", len(prefix) + 1, Length("email") - len(prefix) - len(suffix)
+    )
+    highest = seeded.aggregate(highest=Max(Cast(position, BigIntegerField())))
+    return 0 if highest["highest"] is None else highest["highest"] + 1
+
+
+def insert_fields(model) -> list:
+    return [field for field in model._meta.concrete_fields if not field.generated]
+
+
+def copy_objects(model, objects: list) -> None:
+    """Insert ``objects`` with ``COPY``"""
+    fields = insert_fields(model)
+    # The seeded models only hold values that psycopg adapts as they are, so
+    # rows skip bulk_create's preparation of each value but for timestamps.
+    now = timezone.now()
+    timestamps = [
+        field.attname
+        for field in fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    row = attrgetter(*[field.attname for field in fields])
+    # The connection itself, not the proxy that looks it up on every access
+    db = connections[DEFAULT_DB_ALIAS]
+    quote = db.ops.quote_name
+    columns = ", ".join(quote(field.column) for field in fields)
+    sql = f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN"
+    with db.cursor() as cursor, cursor.cursor.copy(sql) as copy:
+        for obj in objects:
+            for attname in timestamps:
+                setattr(obj, attname, now)
+            copy.write_row(row(obj))
+
+
+class Seeder:
+    """
+    Builds and inserts one chunk of rows at a time. Each chunk draws from a
+    generator seeded with ``seed`` and the chunk's first position, so the
+    rows do not depend on the number of processes or the insert method.
+    """
+
+    def __init__(self, seed: int, method: str, advert_ids=None, skew: float = 1.1):
+        self.seed = seed
+        self.method = method
+        self.advert_ids = advert_ids or []
+        self.cum_weights = zipf_weights(len(self.advert_ids), skew)
+
+    @cached_property
+    def password(self) -> str:
+        # One hash for every user, so that seeding does not pay for thousands.
+        return make_password(USER_PASSWORD)
+
+    def chunk_random(self, kind: str, position: int) -> random.Random:
+        return random.Random(f"{self.seed}-{kind}-{position}")
+
+    @staticmethod
+    def random_uuid(rng: random.Random) -> uuid.UUID:
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    def build_adverts(self, start: int, count: int) -> list[JobAdvert]:
+        rng = self.chunk_random("adverts", start)
+        return [
+            JobAdvert(
+                id=self.random_uuid(rng),
+                title=rng.choice(TITLES),
+                company_name=rng.choice(COMPANIES),
+                employment_type=rng.choice(EmploymentType)[0],
+                experience_level=rng.choice(ExperienceLevel)[0],
+                description=" ".join(rng.choices(WORDS, k=40)),
+                location=rng.choice(LOCATIONS),
+                is_published=rng.random() < 0.9,
+            )
+            for _ in range(count)
+        ]
+
+    def build_applications(self, start: int, count: int) -> list[JobApplication]:
+        rng = self.chunk_random("applications", start)
+        advert_ids = rng.choices(self.advert_ids, cum_weights=self.cum_weights, k=count)
+        applications = []
+        for position, advert_id in enumerate(advert_ids, start=start):
+            first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            handle = f"{first_name}-{last_name}-{position}".lower()
+            applications.append(
+                JobApplication(
+                    id=self.random_uuid(rng),
+                    job_advert_id=advert_id,
+                    first_name=first_name,
+                    last_name=last_name,
+                    # Unique per row, so no insert can hit the email constraint
+                    email=APPLICANT_EMAIL.format(position),
+                    phone=f"+23480{rng.randrange(10**8):08d}",
+                    linkedin_url=f"https://www.linkedin.com/in/{handle}",
+                    github_url=f"https://github.com/{handle}",
+                    website=f"https://{handle}.dev" if rng.random() < 0.3 else None,
+                    experience_years=rng.choice(YearOfExperience)[0],
+                    cover_letter=(
+                        " ".join(rng.choices(WORDS, k=20))
+                        if rng.random() < 0.5
+                        else None
+                    ),
+                )
+            )
+        return applications
+
+    def build_users(self, start: int, count: int) -> list[User]:
+        rng = self.chunk_random("users", start)
+        return [
+            User(
+                id=self.random_uuid(rng),
+                email=USER_EMAIL.format(position),
+                password=self.password,
+            )
+            for position in range(start, start + count)
+        ]
+
+    def insert_chunk(self, kind: str, start: int, count: int) -> int:
+        model, build = {
+            "adverts": (JobAdvert, self.build_adverts),
+            "applications": (JobApplication, self.build_applications),
+            "users": (User, self.build_users),
+        }[kind]
+        objects = build(start, count)
+        if self.method == "copy":
+            copy_objects(model, objects)
+        else:
+            model.objects.bulk_create(objects)
+        return len(objects)
+
+
+_worker_seeder = None
+
+
+def _start_worker(seeder: Seeder) -> None:
+    global _worker_seeder
+    _worker_seeder = seeder
+
+
+def _insert_chunk(kind: str, start: int, count: int) -> int:
+    return _worker_seeder.insert_chunk(kind, start, count)
+
+
+class Command(BaseCommand):
+    help = (
+        "Top the configured database up to --adverts adverts, --applications "
+        "applications and --users users of synthetic data. Applications are "
+        "skewed toward a few adverts with a long tail. Rows are inserted in "
+        "chunks with COPY on Postgres with psycopg 3, else with bulk_create, "
+        "and the same --seed always generates the same rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--adverts", type=int, default=1000)
+        parser.add_argument("--applications", type=int, default=100_000)
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of applications per advert; 0 spreads them evenly.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Rows built and inserted at a time, which bounds memory use.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Worker processes inserting chunks in parallel.",
+        )
+        parser.add_argument("--method", choices=METHODS, default="auto")
+
+    def handle(self, *args, **options):
+        method = options["method"]
+        if method == "auto":
+            method = "copy" if copy_available() else "bulk-create"
+        elif method == "copy" and not copy_available():
+            raise CommandError("COPY needs PostgreSQL with psycopg 3")
+
+        self.seed(Seeder(options["seed"], method), "adverts", JobAdvert, options)
+        self.seed(Seeder(options["seed"], method), "users", User, options)
+        advert_ids = list(JobAdvert.objects.order_by("id").values_list("id", flat=True))
+        if options["applications"] and not advert_ids:
+            raise CommandError("Applications need adverts; set --adverts")
+        seeder = Seeder(options["seed"], method, advert_ids, options["skew"])
+        if self.seed(seeder, "applications", JobApplication, options):
+            # Neither COPY nor bulk_create sends the signals that keep counts.
+            call_command("reconcile_application_counts", stdout=self.stdout)
+
+    def seed(self, seeder: Seeder, kind: str, model, options) -> int:
+        """
+        Insert the rows of ``kind`` missing from ``model``'s table. Users and
+        applications carry their position in their email and resume after the
+        highest one; adverts do not, so they resume after the advert count.
+        """
+        emails = {"users": USER_EMAIL, "applications": APPLICANT_EMAIL}
+        if kind in emails:
+            start = next_position(model, emails[kind])
+        else:
+            start = model.objects.count()
+        total = options[kind]
+        batch_size = options["batch_size"]
+        chunks = [
+            (kind, position, min(batch_size, total - position))
+            for position in range(start, total, batch_size)
+        ]
+        if not chunks:
+            return 0
+
+        if options["processes"] > 1:
+            # Children must open their own connections, not share the parent's.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                options["processes"],
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_start_worker,
+                initargs=(seeder,),
+            )
+            with executor:
+                counts = executor.map(_insert_chunk, *zip(*chunks))
+                self.report(kind, counts, total - start)
+        else:
+            counts = (seeder.insert_chunk(*chunk) for chunk in chunks)
+            self.report(kind, counts, total - start)
+        return total - start
+
+    def report(self, kind: str, counts, missing: int) -> None:
+        done = 0
+        for count in counts:
+            done += count
+            self.stdout.write(f"Seeded {done}/{missing} {kind}", ending="\r")
+        self.stdout.write("")
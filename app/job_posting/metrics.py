@@ -0,0 +1,30 @@
+from django.db.models import Count, Q
+from django.utils import timezone
+from prometheus_client import Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+from .models import JobAdvert
+
+PUBLISH_LAG = Histogram(
+    "jobboard_advert_publish_lag_seconds",
+    "Time between an advert's publish_at and its publication",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
+
+
+class ScheduledAdvertsCollector:
+    """The scheduled adverts, read from the database when scraped"""
+
+    def collect(self):
+        backlog = JobAdvert.objects.filter(publish_at__isnull=False).aggregate(
+            due=Count("id", filter=Q(publish_at__lte=timezone.now())),
+            pending=Count("id"),
+        )
+        gauge = GaugeMetricFamily(
+            "jobboard_scheduled_adverts",
+            "Adverts waiting to be published: due ones are past their publish_at",
+            labels=["state"],
+        )
+        gauge.add_metric(["due"], backlog["due"])
+        gauge.add_metric(["pending"], backlog["pending"] - backlog["due"])
+        yield gauge
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.7 on 2026-10-17 23:14
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_applications_count(apps, schema_editor):
+    JobAdvert = apps.get_model("job_posting", "JobAdvert")
+    JobApplication = apps.get_model("job_posting", "JobApplication")
+    applications = (
+        JobApplication.objects.filter(job_advert=OuterRef("pk"))
+        .order_by()
+        .values("job_advert")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    JobAdvert.objects.update(applications_count=Coalesce(Subquery(applications), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_posting', '0002_alter_jobapplication_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobadvert',
+            name='applications_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_applications_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='jobadvert',
+            index=models.Index(fields=['-is_published', '-applications_count', '-created_at'], name='jobadvert_listing_idx'),
+        ),
+    ]
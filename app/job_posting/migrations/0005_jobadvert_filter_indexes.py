@@ -0,0 +1,53 @@
+# Generated by Django 5.0.7 on 2026-10-17 23:23
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_posting", "0004_jobadvert_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="jobadvert",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=[
+                    "employment_type",
+                    "experience_level",
+                    "-applications_count",
+                    "-created_at",
+                ],
+                name="jobadvert_pub_type_level_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobadvert",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["experience_level", "-applications_count", "-created_at"],
+                name="jobadvert_pub_level_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobadvert",
+            index=models.Index(
+                django.db.models.functions.text.Upper("location"),
+                models.OrderBy(models.F("applications_count"), descending=True),
+                models.OrderBy(models.F("created_at"), descending=True),
+                condition=models.Q(("is_published", True)),
+                name="jobadvert_pub_location_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobadvert",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["created_at"],
+                name="jobadvert_pub_created_idx",
+            ),
+        ),
+    ]
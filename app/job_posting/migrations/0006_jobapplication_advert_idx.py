@@ -0,0 +1,20 @@
+# Generated by Django 5.0.7 on 2026-10-17 23:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_posting", "0005_jobadvert_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="jobapplication",
+            index=models.Index(
+                fields=["job_advert", "created_at", "id"],
+                name="jobapplication_advert_idx",
+            ),
+        ),
+    ]
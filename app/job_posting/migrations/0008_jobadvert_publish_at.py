@@ -0,0 +1,26 @@
+# Generated by Django 5.0.7 on 2026-10-17 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_posting", "0007_dataexport"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobadvert",
+            name="publish_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="jobadvert",
+            index=models.Index(
+                condition=models.Q(("publish_at__isnull", False)),
+                fields=["publish_at"],
+                name="jobadvert_publish_at_idx",
+            ),
+        ),
+    ]
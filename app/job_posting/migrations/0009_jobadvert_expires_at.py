@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-17 23:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_posting", "0008_jobadvert_publish_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobadvert",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="jobadvert",
+            index=models.Index(
+                condition=models.Q(
+                    ("expires_at__isnull", False), ("is_published", True)
+                ),
+                fields=["expires_at"],
+                name="jobadvert_pub_expires_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.0.7 on 2026-10-17 23:47
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_posting", "0009_jobadvert_expires_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jobapplication",
+            name="idempotency_key",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, null=True
+            ),
+        ),
+        # Keep the earliest of each advert's applications per email and take
+        # the rest off its count, so the unique index can be built.
+        migrations.RunSQL(
+            sql="""
+                WITH removed AS (
+                    DELETE FROM job_posting_jobapplication AS duplicate
+                    USING job_posting_jobapplication AS kept
+                    WHERE duplicate.job_advert_id = kept.job_advert_id
+                      AND LOWER(duplicate.email) = LOWER(kept.email)
+                      AND (duplicate.created_at, duplicate.id)
+                        > (kept.created_at, kept.id)
+                    RETURNING duplicate.job_advert_id
+                )
+                UPDATE job_posting_jobadvert AS advert
+                SET applications_count = GREATEST(advert.applications_count - removed.count, 0)
+                FROM (
+                    SELECT job_advert_id, COUNT(*) AS count
+                    FROM removed
+                    GROUP BY job_advert_id
+                ) AS removed
+                WHERE advert.id = removed.job_advert_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="jobapplication",
+            constraint=models.UniqueConstraint(
+                models.F("job_advert"),
+                django.db.models.functions.text.Lower("email"),
+                name="jobapplication_unique_email",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="jobapplication",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("idempotency_key__isnull", False)),
+                fields=("job_advert", "idempotency_key"),
+                name="jobapplication_unique_idempotency_key",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_posting", "0010_jobapplication_unique_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="is_staff",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-18 01:02
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("job_posting", "0011_user_is_staff"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="jobadvert",
+            name="jobadvert_listing_idx",
+        ),
+        migrations.AddIndex(
+            model_name="jobadvert",
+            index=models.Index(
+                models.OrderBy(models.F("is_published"), descending=True),
+                models.OrderBy(models.F("applications_count"), descending=True),
+                models.OrderBy(models.F("created_at"), descending=True),
+                django.db.models.functions.comparison.Coalesce(
+                    "expires_at",
+                    django.db.models.functions.comparison.Cast(
+                        models.Value("infinity"), models.DateTimeField()
+                    ),
+                ),
+                name="jobadvert_listing_idx",
+            ),
+        ),
+    ]
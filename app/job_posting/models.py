@@ -1,14 +1,34 @@
+import os
+from collections import Counter
+
 from common.models import AuditableModel
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.core.files.storage import FileSystemStorage
 from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Cast, Coalesce, Lower, Now, Upper
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
 
-from .enums import EmploymentType, ExperienceLevel, YearOfExperience
+from .enums import (
+    EmploymentType,
+    ExperienceLevel,
+    ExportFormat,
+    ExportKind,
+    ExportStatus,
+    YearOfExperience,
+)
 from .managers import CustomUserManager
 
 
 class User(AbstractBaseUser, AuditableModel):
     email = models.EmailField(unique=True)
     password = models.CharField(max_length=255)
+    # Admins can read operational endpoints such as the profiling report.
+    is_staff = models.BooleanField(default=False)
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
     objects = CustomUserManager()
@@ -20,6 +40,11 @@ class User(AbstractBaseUser, AuditableModel):
         return self.email
 
 
+def expiry_time():
+    """``expires_at``, or infinity for adverts that never expire"""
+    return Coalesce("expires_at", Cast(Value("infinity"), models.DateTimeField()))
+
+
 class JobAdvert(AuditableModel):
     title = models.CharField(max_length=150)
     company_name = models.CharField(max_length=150)
@@ -28,10 +53,138 @@ class JobAdvert(AuditableModel):
     description = models.TextField()
     location = models.CharField(max_length=200)
     is_published = models.BooleanField(default=True)
+    publish_at = models.DateTimeField(blank=True, null=True)
+    expires_at = models.DateTimeField(blank=True, null=True)
+    applications_count = models.PositiveIntegerField(default=0, editable=False)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector("company_name", weight="B", config="english")
+            + SearchVector("location", weight="B", config="english")
+            + SearchVector("description", weight="C", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            # The listing order, then the expiry time, so that the public
+            # listing skips expired adverts within the index.
+            models.Index(
+                F("is_published").desc(),
+                F("applications_count").desc(),
+                F("created_at").desc(),
+                expiry_time(),
+                name="jobadvert_listing_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="jobadvert_search_idx"),
+            # Partial indexes over the published adverts anonymous users browse,
+            # one per filter, ending in the listing order where it helps.
+            models.Index(
+                fields=[
+                    "employment_type",
+                    "experience_level",
+                    "-applications_count",
+                    "-created_at",
+                ],
+                condition=models.Q(is_published=True),
+                name="jobadvert_pub_type_level_idx",
+            ),
+            models.Index(
+                fields=["experience_level", "-applications_count", "-created_at"],
+                condition=models.Q(is_published=True),
+                name="jobadvert_pub_level_idx",
+            ),
+            models.Index(
+                Upper("location"),
+                F("applications_count").desc(),
+                F("created_at").desc(),
+                condition=models.Q(is_published=True),
+                name="jobadvert_pub_location_idx",
+            ),
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(is_published=True),
+                name="jobadvert_pub_created_idx",
+            ),
+            # Scheduled adverts, for the periodic publish sweep
+            models.Index(
+                fields=["publish_at"],
+                condition=models.Q(publish_at__isnull=False),
+                name="jobadvert_publish_at_idx",
+            ),
+            # Published adverts that expire, for the expiry sweep
+            models.Index(
+                fields=["expires_at"],
+                condition=models.Q(is_published=True, expires_at__isnull=False),
+                name="jobadvert_pub_expires_idx",
+            ),
+        ]
 
     def publish_advert(self) -> None:
+        """
+        Publish the advert now, clearing ``publish_at`` and an ``expires_at``
+        that has already passed.
+        """
         self.is_published = True
-        self.save(update_fields=["is_published"])
+        self.publish_at = None
+        if self.expires_at is not None and self.expires_at <= timezone.now():
+            # Otherwise the next expiry sweep would unpublish it again.
+            self.expires_at = None
+        self.save(
+            update_fields=["is_published", "publish_at", "expires_at", "updated_at"]
+        )
+
+
+def unexpired() -> models.Q:
+    """
+    Adverts without an expiry time, or whose expiry time is still ahead, as
+    one comparison that ``jobadvert_listing_idx`` can apply.
+    """
+    return models.Q(GreaterThan(expiry_time(), Now()))
+
+
+class JobApplicationQuerySet(models.QuerySet):
+    def insert_new(self, applications: list) -> list:
+        """
+        Insert ``applications`` with a single ``INSERT ... ON CONFLICT DO
+        NOTHING`` and count the new ones against their adverts.
+
+        Rows that would repeat an email or an idempotency key already used
+        for the same advert are skipped by the database, so concurrent
+        duplicates cannot slip in between a check and the insert. Returns
+        the applications that were inserted. Call it inside a transaction.
+        """
+        if not applications:
+            return []
+        self.bulk_create(applications, ignore_conflicts=True)
+        # Primary keys are generated here, so a row with one of them exists
+        # only if this insert wrote it.
+        inserted_ids = set(
+            self.filter(
+                id__in=[application.id for application in applications]
+            ).values_list("id", flat=True)
+        )
+        inserted = [
+            application
+            for application in applications
+            if application.id in inserted_ids
+        ]
+        counts = Counter(application.job_advert_id for application in inserted)
+        if counts:
+            # bulk_create sends no post_save, so count them in a single UPDATE.
+            JobAdvert.objects.filter(id__in=counts).update(
+                applications_count=F("applications_count")
+                + Case(
+                    *(
+                        When(id=advert_id, then=count)
+                        for advert_id, count in counts.items()
+                    )
+                ),
+                updated_at=timezone.now(),
+            )
+        return inserted
 
 
 class JobApplication(AuditableModel):
@@ -47,6 +200,88 @@ class JobApplication(AuditableModel):
     job_advert = models.ForeignKey(
         JobAdvert, related_name="applications", on_delete=models.CASCADE
     )
+    # The Idempotency-Key header of the apply request that created it
+    idempotency_key = models.CharField(
+        max_length=255, blank=True, null=True, editable=False
+    )
+
+    objects = JobApplicationQuerySet.as_manager()
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [
+            # An advert's applications in order, for paging and exports
+            models.Index(
+                fields=["job_advert", "created_at", "id"],
+                name="jobapplication_advert_idx",
+            ),
+        ]
+        constraints = [
+            # One application per email and advert, whatever the email's case
+            models.UniqueConstraint(
+                "job_advert",
+                Lower("email"),
+                name="jobapplication_unique_email",
+            ),
+            models.UniqueConstraint(
+                fields=["job_advert", "idempotency_key"],
+                condition=models.Q(idempotency_key__isnull=False),
+                name="jobapplication_unique_idempotency_key",
+            ),
+        ]
+
+
+class ExportStorage(FileSystemStorage):
+    """Local storage for exports that follows ``EXPORT_ROOT`` when it changes"""
+
+    @property
+    def base_location(self) -> str:
+        return settings.EXPORT_ROOT
+
+    @property
+    def location(self) -> str:
+        return os.path.abspath(self.base_location)
+
+
+def export_storage() -> ExportStorage:
+    return ExportStorage()
+
+
+class DataExport(AuditableModel):
+    requested_by = models.ForeignKey(
+        User, related_name="exports", on_delete=models.CASCADE
+    )
+    kind = models.CharField(max_length=20, choices=ExportKind)
+    job_advert = models.ForeignKey(
+        JobAdvert,
+        related_name="exports",
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+    company_name = models.CharField(max_length=150, blank=True)
+    export_format = models.CharField(max_length=10, choices=ExportFormat)
+    compress = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=ExportStatus, default="pending")
+    rows_written = models.PositiveIntegerField(default=0)
+    total_rows = models.PositiveIntegerField(blank=True, null=True)
+    file = models.FileField(storage=export_storage, blank=True)
+    error = models.TextField(blank=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ("-created_at",)
+
+    @property
+    def progress(self) -> int:
+        """Percentage of rows written so far"""
+        if self.status == "completed":
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, self.rows_written * 100 // self.total_rows)
+
+    @property
+    def filename(self) -> str:
+        name = f"{self.kind.replace('_', '-')}-{self.id}.{self.export_format}"
+        return f"{name}.gz" if self.compress else name
@@ -1,8 +1,13 @@
+from core.profiling import ProfiledSerializerMixin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
+from django.urls import reverse
 from rest_framework import serializers
 
-from .models import JobAdvert, JobApplication, User
+from .cache import invalidate_adverts
+from .models import DataExport, JobAdvert, JobApplication, User
+
+DUPLICATE_APPLICATION = "You have already applied for this advert."
 
 
 class CreateUserSerializer(serializers.Serializer):
@@ -31,7 +36,7 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(allow_blank=False)
 
 
-class JobApplicationSerializer(serializers.ModelSerializer):
+class JobApplicationSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = JobApplication
         fields = [
@@ -53,11 +58,47 @@ class JobApplicationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         job_advert: JobAdvert = self.context["job_advert"]
-        validated_data["job_advert"] = job_advert
-        return super().create(validated_data)
+        idempotency_key = self.context.get("idempotency_key")
+        application = JobApplication(
+            **validated_data, job_advert=job_advert, idempotency_key=idempotency_key
+        )
+        if JobApplication.objects.insert_new([application]):
+            invalidate_adverts(job_advert.id)
+            return application
+
+        if idempotency_key:
+            # A retry of a request that was already applied
+            replayed = job_advert.applications.filter(
+                idempotency_key=idempotency_key
+            ).first()
+            if replayed is not None:
+                return replayed
+        raise serializers.ValidationError({"email": [DUPLICATE_APPLICATION]})
+
+
+class BulkJobApplicationSerializer(JobApplicationSerializer):
+    """An application that names the advert it is for"""
+
+    job_advert = serializers.UUIDField(source="job_advert_id")
+
+    class Meta(JobApplicationSerializer.Meta):
+        extra_kwargs = {}
+
+
+class BulkApplicationResultSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=["created", "rejected"])
+    id = serializers.UUIDField(required=False)
+    errors = serializers.DictField(required=False)
 
 
-class CreateJobAdvertSerializer(serializers.ModelSerializer):
+class BulkApplyResponseSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    rejected = serializers.IntegerField()
+    results = BulkApplicationResultSerializer(many=True)
+
+
+class CreateJobAdvertSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = JobAdvert
         fields = [
@@ -69,6 +110,7 @@ class CreateJobAdvertSerializer(serializers.ModelSerializer):
             "description",
             "location",
             "is_published",
+            "expires_at",
             "created_at",
         ]
 
@@ -77,8 +119,10 @@ class CreateJobAdvertSerializer(serializers.ModelSerializer):
         }
 
 
-class ListJobAdvertSerializer(serializers.ModelSerializer):
-    applicant_count = serializers.SerializerMethodField(read_only=True)
+class ListJobAdvertSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
+    applicant_count = serializers.IntegerField(
+        source="applications_count", read_only=True
+    )
 
     class Meta:
         model = JobAdvert
@@ -91,13 +135,73 @@ class ListJobAdvertSerializer(serializers.ModelSerializer):
             "description",
             "location",
             "is_published",
+            "publish_at",
+            "expires_at",
             "created_at",
             "applicant_count",
         ]
-
-    def get_applicant_count(self, obj: JobAdvert) -> int:
-        return obj.applications.count()
+        read_only_fields = ["publish_at"]
 
 
 class JobAdvertScheduleSerializer(serializers.Serializer):
     date_time = serializers.DateTimeField()
+
+
+class FacetCountSerializer(serializers.Serializer):
+    value = serializers.CharField()
+    count = serializers.IntegerField()
+
+
+class JobAdvertFacetsSerializer(serializers.Serializer):
+    employment_type = FacetCountSerializer(many=True)
+    experience_level = FacetCountSerializer(many=True)
+    location = FacetCountSerializer(many=True)
+
+
+class DataExportSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
+    progress = serializers.IntegerField(read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DataExport
+        fields = [
+            "id",
+            "kind",
+            "job_advert",
+            "company_name",
+            "export_format",
+            "compress",
+            "status",
+            "rows_written",
+            "total_rows",
+            "progress",
+            "error",
+            "download_url",
+            "created_at",
+            "completed_at",
+        ]
+        read_only_fields = [
+            "status",
+            "rows_written",
+            "total_rows",
+            "error",
+            "created_at",
+            "completed_at",
+        ]
+
+    def get_download_url(self, data_export: DataExport) -> str | None:
+        if data_export.status != "completed":
+            return None
+        url = reverse("export:export-download", kwargs={"pk": str(data_export.id)})
+        return self.context["request"].build_absolute_uri(url)
+
+    def validate(self, attrs: dict):
+        if attrs["kind"] == "applications" and not attrs.get("job_advert"):
+            raise serializers.ValidationError(
+                {"job_advert": "An advert is required to export its applications."}
+            )
+        if attrs["kind"] == "company_adverts" and not attrs.get("company_name"):
+            raise serializers.ValidationError(
+                {"company_name": "A company is required to export its adverts."}
+            )
+        return super().validate(attrs)
@@ -0,0 +1,68 @@
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .authentication import forget_tokens
+from .cache import invalidate_adverts
+from .models import JobAdvert, JobApplication, User
+
+
+def deleted_with_advert(origin) -> bool:
+    """Whether a deletion started from one or more adverts, not applications"""
+    if isinstance(origin, QuerySet):
+        return origin.model is JobAdvert
+    return isinstance(origin, JobAdvert)
+
+
+@receiver(post_save, sender=JobApplication)
+def increment_applications_count(sender, instance: JobApplication, created, **kwargs):
+    """
+    Keep JobAdvert.applications_count in step with new applications. The
+    advert's updated_at moves too, as its Last-Modified covers the count.
+    """
+    if created:
+        JobAdvert.objects.filter(id=instance.job_advert_id).update(
+            applications_count=F("applications_count") + 1, updated_at=timezone.now()
+        )
+
+
+@receiver(post_delete, sender=JobApplication)
+def decrement_applications_count(sender, instance: JobApplication, origin, **kwargs):
+    """Keep JobAdvert.applications_count in step with deleted applications"""
+    if deleted_with_advert(origin):
+        # The advert itself is being deleted along with its applications.
+        return
+    JobAdvert.objects.filter(
+        id=instance.job_advert_id, applications_count__gt=0
+    ).update(applications_count=F("applications_count") - 1, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=JobAdvert)
+@receiver(post_delete, sender=JobAdvert)
+def invalidate_advert_cache(sender, instance: JobAdvert, **kwargs):
+    invalidate_adverts(instance.id)
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_applied_advert_cache(
+    sender, instance: JobApplication, origin=None, **kwargs
+):
+    if deleted_with_advert(origin):
+        return
+    invalidate_adverts(instance.job_advert_id)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance: Token, **kwargs):
+    forget_tokens(instance.key)
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(sender, instance: User, created, **kwargs):
+    """Re-authenticate a changed (e.g. deactivated) user instead of its cached copy"""
+    if created:
+        return
+    forget_tokens(*Token.objects.filter(user=instance).values_list("key", flat=True))
@@ -1,10 +1,112 @@
+from datetime import timedelta
+
 from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
 
-from .models import JobAdvert
+from .cache import invalidate_adverts
+from .exports import write_export
+from .metrics import PUBLISH_LAG
+from .models import DataExport, JobAdvert
 
 
 @shared_task()
 def schedule_job_advert(job_id):
-    """Publish an advert at the set time"""
+    """
+    Publish an advert at the set time.
+
+    Kept for ETA messages queued before scheduling moved to
+    ``JobAdvert.publish_at``; adverts that are already published are left
+    alone.
+    """
     job_post = JobAdvert.objects.get(id=job_id)
-    job_post.publish_advert()
+    if not job_post.is_published:
+        job_post.publish_advert()
+
+
+@shared_task()
+def publish_due_adverts():
+    """Publish every advert whose ``publish_at`` has passed, in one UPDATE"""
+    now = timezone.now()
+    with transaction.atomic():
+        due = dict(
+            JobAdvert.objects.filter(publish_at__lte=now)
+            .select_for_update(skip_locked=True)
+            .values_list("id", "publish_at")
+        )
+        due_ids = list(due)
+        # An expires_at that has already passed is cleared, as publish_advert
+        # does, or the next expiry sweep would unpublish the advert again.
+        JobAdvert.objects.filter(id__in=due_ids).update(
+            is_published=True,
+            publish_at=None,
+            expires_at=Case(
+                When(expires_at__lte=now, then=None), default=F("expires_at")
+            ),
+            updated_at=now,
+        )
+    for publish_at in due.values():
+        PUBLISH_LAG.observe((now - publish_at).total_seconds())
+    # update() sends no signals, so the cached responses are dropped here.
+    if due_ids:
+        invalidate_adverts(*due_ids)
+    return len(due_ids)
+
+
+@shared_task()
+def export_data(export_id):
+    """Write a requested export to local storage"""
+    data_export = DataExport.objects.get(id=export_id)
+    try:
+        write_export(data_export)
+    except Exception as error:
+        DataExport.objects.filter(id=export_id).update(
+            status="failed", error=str(error)
+        )
+        raise
+
+
+@shared_task()
+def delete_old_exports():
+    """
+    Delete the exports requested more than ``EXPORT_RETENTION_DAYS`` days
+    ago, along with their files.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.EXPORT_RETENTION_DAYS)
+    old_exports = list(
+        DataExport.objects.filter(created_at__lt=cutoff).only("id", "file")
+    )
+    for data_export in old_exports:
+        # A pending or failed export has no file to delete.
+        data_export.file.delete(save=False)
+    DataExport.objects.filter(id__in=[export.id for export in old_exports]).delete()
+    return len(old_exports)
+
+
+@shared_task()
+def expire_adverts():
+    """
+    Unpublish every published advert whose ``expires_at`` has passed.
+
+    Adverts are unpublished ``EXPIRY_SWEEP_BATCH_SIZE`` at a time, each batch
+    in its own short transaction, so rows are never locked for long.
+    """
+    now = timezone.now()
+    expired = JobAdvert.objects.filter(is_published=True, expires_at__lte=now)
+    total = 0
+    while True:
+        with transaction.atomic():
+            batch_ids = list(
+                expired.select_for_update(skip_locked=True).values_list(
+                    "id", flat=True
+                )[: settings.EXPIRY_SWEEP_BATCH_SIZE]
+            )
+            JobAdvert.objects.filter(id__in=batch_ids).update(
+                is_published=False, updated_at=now
+            )
+        if not batch_ids:
+            return total
+        invalidate_adverts(*batch_ids)
+        total += len(batch_ids)
@@ -0,0 +1,14 @@
+from django.urls import include, path
+from job_posting.async_views import ASYNC_VIEWS, async_routes
+from job_posting.urls.job_posting import router
+
+# Every job board route that has one is served by its async view.
+actions = [action for action, *_ in ASYNC_VIEWS.values()]
+
+urlpatterns = [
+    path("api/v1/auth/", include("job_posting.urls.auth")),
+    path(
+        "api/v1/posting/",
+        include((async_routes(router.urls, actions), "job_posting")),
+    ),
+]
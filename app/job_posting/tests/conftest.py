@@ -1,4 +1,9 @@
+from contextlib import contextmanager
+
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from job_posting.models import User
 from pytest_factoryboy import register
@@ -8,12 +13,65 @@ from .factories import UserFactory
 
 register(UserFactory)
 
+# Page sizes that list endpoints are tested at, so that a budget that holds for
+# all of them cannot hide queries made per row
+PAGE_SIZES = [1, 5, 20]
+
 
 def api_client_with_credentials(token: str, api_client):
     """Sets a credential on the default api client"""
     return api_client.credentials(HTTP_AUTHORIZATION="Token " + token)
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Keeps cached counts and responses from leaking between tests"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def read_from_primary(settings):
+    """
+    Keeps reads off the replica, whose connection cannot see the writes of a
+    test's open transaction. Tests of replica routing opt back in.
+    """
+    settings.DATABASE_REPLICA_ALIAS = None
+
+
+@pytest.fixture(params=PAGE_SIZES)
+def page_size(request) -> int:
+    """Runs a test once per page size of ``PAGE_SIZES``"""
+    return request.param
+
+
+@pytest.fixture
+def query_budget(db):
+    """
+    Returns a context manager that fails the test, listing every statement, when
+    its block makes more than ``max_queries`` queries
+    """
+
+    @contextmanager
+    def assert_within_budget(max_queries: int):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        queries = context.captured_queries
+        if len(queries) > max_queries:
+            statements = "\n".join(
+                f"{number}. {query['sql']}"
+                for number, query in enumerate(queries, start=1)
+            )
+            pytest.fail(
+                f"{len(queries)} queries exceed the budget of {max_queries}:\n"
+                f"{statements}",
+                pytrace=False,
+            )
+
+    return assert_within_budget
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -31,7 +31,7 @@ class JobApplicationFactory(factory.django.DjangoModelFactory):
 
     first_name = fake.text(max_nb_chars=20)
     last_name = fake.text(max_nb_chars=20)
-    email = fake.email()
+    email = factory.Sequence(lambda n: "applicant{}@example.com".format(n))
     phone = fake.phone_number()
     linkedin_url = fake.uri()
     github_url = fake.uri()
@@ -0,0 +1,149 @@
+import inspect
+
+import pytest
+from django.core.cache import cache
+from django.urls import resolve, reverse
+from job_posting.cache import LIST_VERSION_KEY
+from job_posting.models import JobAdvert
+from rest_framework.test import APIClient
+
+from .conftest import api_client_with_credentials
+from .factories import JobAdvertFactory, JobApplicationFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def async_views(settings):
+    settings.ROOT_URLCONF = "job_posting.tests.async_urls"
+
+
+class TestAsyncViews:
+    list_job_advert_url = reverse("job_posting:jobadvert-list")
+
+    def get_sync_and_async(self, api_client: APIClient, settings, url, params=None):
+        sync_response = api_client.get(url, params)
+        # Drop the cached response, but not the listing version in the ETag.
+        list_version = cache.get(LIST_VERSION_KEY)
+        cache.clear()
+        cache.set(LIST_VERSION_KEY, list_version, None)
+        settings.ROOT_URLCONF = "job_posting.tests.async_urls"
+        assert inspect.iscoroutinefunction(resolve(url).func)
+        async_response = api_client.get(url, params)
+        assert async_response.status_code == sync_response.status_code
+        assert async_response["ETag"] == sync_response["ETag"]
+        return sync_response.json(), async_response.json()
+
+    def test_list_matches_sync_view(self, api_client: APIClient, settings):
+        JobAdvertFactory.create_batch(3, employment_type="Contract")
+        JobAdvertFactory(employment_type="Full Time")
+        JobAdvertFactory(employment_type="Contract", is_published=False)
+        params = {"employment_type": "Contract", "page_size": 2, "page": 2}
+        sync_json, async_json = self.get_sync_and_async(
+            api_client, settings, self.list_job_advert_url, params
+        )
+        assert async_json == sync_json
+        assert async_json["total"] == 3
+
+    def test_retrieve_matches_sync_view(self, api_client: APIClient, settings):
+        job_advert = JobAdvertFactory()
+        JobApplicationFactory.create_batch(2, job_advert=job_advert)
+        url = reverse("job_posting:jobadvert-detail", kwargs={"pk": str(job_advert.id)})
+        sync_json, async_json = self.get_sync_and_async(api_client, settings, url)
+        assert async_json == sync_json
+        assert async_json["applicant_count"] == 2
+
+    def test_applications_match_sync_view(
+        self, api_client: APIClient, authenticate_user, settings
+    ):
+        job_advert = JobAdvertFactory()
+        for i in range(3):
+            JobApplicationFactory(job_advert=job_advert, email=f"{i}@example.com")
+        api_client_with_credentials(authenticate_user, api_client)
+        url = reverse(
+            "job_posting:jobadvert-applications", kwargs={"pk": str(job_advert.id)}
+        )
+        sync_response = api_client.get(url, {"page_size": 2})
+        settings.ROOT_URLCONF = "job_posting.tests.async_urls"
+        async_response = api_client.get(url, {"page_size": 2})
+        assert async_response.json() == sync_response.json()
+        assert async_response.json()["total"] == 3
+
+    def test_list_query_count(
+        self, api_client: APIClient, async_views, django_assert_num_queries
+    ):
+        JobAdvertFactory.create_batch(5)
+        # The COUNT and the page.
+        with django_assert_num_queries(2):
+            response = api_client.get(self.list_job_advert_url)
+        assert response.json()["total"] == 5
+        with django_assert_num_queries(0):
+            response = api_client.get(
+                self.list_job_advert_url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        assert response.status_code == 304
+
+    def test_unpublished_advert_is_hidden(self, api_client: APIClient, async_views):
+        job_advert = JobAdvertFactory(is_published=False)
+        url = reverse("job_posting:jobadvert-detail", kwargs={"pk": str(job_advert.id)})
+        assert api_client.get(url).status_code == 404
+
+    def test_invalid_token(self, api_client: APIClient, async_views):
+        api_client_with_credentials("a-random-token", api_client)
+        response = api_client.get(self.list_job_advert_url)
+        assert response.status_code == 401
+        assert response["WWW-Authenticate"] == "Token"
+
+    def test_applications_require_authentication(
+        self, api_client: APIClient, async_views
+    ):
+        job_advert = JobAdvertFactory()
+        url = reverse(
+            "job_posting:jobadvert-applications", kwargs={"pk": str(job_advert.id)}
+        )
+        assert api_client.get(url).status_code == 401
+
+    def test_apply(self, api_client: APIClient, async_views):
+        job_advert: JobAdvert = JobAdvertFactory()
+        data = {
+            "first_name": "string",
+            "last_name": "string",
+            "email": "user@example.com",
+            "phone": "string",
+            "linkedin_url": "http://127.0.0.1:8000",
+            "github_url": "http://127.0.0.1:8000",
+            "website": "http://127.0.0.1:8000",
+            "experience_years": "0-1",
+            "cover_letter": "string",
+        }
+        url = reverse("job_posting:jobadvert-apply", kwargs={"pk": str(job_advert.id)})
+        response = api_client.post(url, data)
+        assert response.status_code == 200
+        job_advert.refresh_from_db()
+        assert job_advert.applications_count == 1
+
+        response = api_client.post(url, {**data, "email": "not-an-email"})
+        assert response.status_code == 400
+        assert "email" in response.json()
+
+    def test_other_requests_use_sync_view(
+        self, api_client: APIClient, authenticate_user, async_views
+    ):
+        JobAdvertFactory.create_batch(2)
+        response = api_client.get(
+            self.list_job_advert_url, {"pagination": "cursor", "page_size": 1}
+        )
+        assert response.status_code == 200
+        assert response.json()["links"]["next"]
+
+        api_client_with_credentials(authenticate_user, api_client)
+        data = {
+            "title": "string",
+            "company_name": "string",
+            "employment_type": "Full Time",
+            "experience_level": "Entry Level",
+            "description": "string",
+            "location": "string",
+        }
+        response = api_client.post(self.list_job_advert_url, data)
+        assert response.status_code == 201
@@ -1,4 +1,7 @@
 import pytest
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, get_hasher
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from job_posting.models import User
 from rest_framework.authtoken.models import Token
@@ -14,10 +17,15 @@ class TestUserAuth:
     logout_url = reverse("auth:auth-logout")
 
     def test_login(
-        self, api_client: APIClient, user_instance: User, auth_user_password
+        self,
+        api_client: APIClient,
+        user_instance: User,
+        auth_user_password,
+        query_budget,
     ):
         data = {"email": user_instance.email, "password": auth_user_password}
-        response = api_client.post(self.login_url, data)
+        with query_budget(5):
+            response = api_client.post(self.login_url, data)
         assert response.status_code == 200
         assert "token" in response.json()
 
@@ -25,20 +33,130 @@ class TestUserAuth:
         self,
         api_client: APIClient,
         user_instance: User,
+        query_budget,
     ):
         data = {"email": user_instance.email, "password": "a random password"}
-        response = api_client.post(self.login_url, data)
+        with query_budget(1):
+            response = api_client.post(self.login_url, data)
         assert response.status_code == 400
         assert "error" in response.json()
 
-    def test_logout(self, api_client: APIClient, user_instance: User):
+    def test_logout(
+        self, api_client: APIClient, user_instance: User, query_budget
+    ):
         token, _ = Token.objects.get_or_create(user=user_instance)
         api_client_with_credentials(token.key, api_client)
-        response = api_client.post(self.logout_url)
+        with query_budget(2):
+            response = api_client.post(self.logout_url)
         assert response.status_code == 200
 
-    def test_logout_invalid_token(self, api_client: APIClient):
+    def test_logout_invalid_token(self, api_client: APIClient, query_budget):
         token = "a-random-token"
         api_client_with_credentials(token, api_client)
-        response = api_client.post(self.logout_url)
+        with query_budget(1):
+            response = api_client.post(self.logout_url)
         assert response.status_code == 401
+
+
+class TestCachedTokenAuthentication:
+    logout_url = reverse("auth:auth-logout")
+    exports_url = reverse("export:export-list")
+
+    def get_token_queries(self, api_client: APIClient) -> list[str]:
+        with CaptureQueriesContext(connection) as context:
+            assert api_client.get(self.exports_url).status_code == 200
+        return [
+            query["sql"]
+            for query in context.captured_queries
+            if Token._meta.db_table in query["sql"]
+        ]
+
+    def test_token_is_cached(self, api_client: APIClient, user_instance: User):
+        token, _ = Token.objects.get_or_create(user=user_instance)
+        api_client_with_credentials(token.key, api_client)
+        assert len(self.get_token_queries(api_client)) == 1
+        assert self.get_token_queries(api_client) == []
+
+    def test_saving_user_forgets_token(
+        self, api_client: APIClient, user_instance: User
+    ):
+        token, _ = Token.objects.get_or_create(user=user_instance)
+        api_client_with_credentials(token.key, api_client)
+        self.get_token_queries(api_client)
+
+        user_instance.save()
+        assert len(self.get_token_queries(api_client)) == 1
+
+    def test_logout_forgets_token(self, api_client: APIClient, user_instance: User):
+        token, _ = Token.objects.get_or_create(user=user_instance)
+        api_client_with_credentials(token.key, api_client)
+        assert api_client.get(self.exports_url).status_code == 200
+        assert api_client.post(self.logout_url).status_code == 200
+        assert api_client.get(self.exports_url).status_code == 401
+
+    def test_deleting_user_forgets_token(
+        self, api_client: APIClient, user_instance: User
+    ):
+        token, _ = Token.objects.get_or_create(user=user_instance)
+        api_client_with_credentials(token.key, api_client)
+        assert api_client.get(self.exports_url).status_code == 200
+
+        user_instance.delete()
+        assert api_client.get(self.exports_url).status_code == 401
+
+
+class TestPasswordHasherPolicy:
+    login_url = reverse("auth:auth-login")
+    create_user_url = reverse("user:user-list")
+
+    def test_signup_uses_preferred_hasher(self, api_client: APIClient, settings):
+        settings.PASSWORD_HASHERS = [
+            "job_posting.hashers.TunedScryptPasswordHasher",
+            "job_posting.hashers.TunedPBKDF2PasswordHasher",
+        ]
+        settings.PASSWORD_SCRYPT_WORK_FACTOR = 2**10
+        data = {"email": "user@example.com", "password": "TestPass@1"}
+        response = api_client.post(self.create_user_url, data)
+        assert response.status_code == 200
+        password = User.objects.get(email="user@example.com").password
+        assert password.startswith("scrypt$1024$")
+
+    def test_login_upgrades_hash_to_preferred_hasher(
+        self,
+        api_client: APIClient,
+        user_instance: User,
+        auth_user_password: str,
+        settings,
+    ):
+        assert user_instance.password.startswith("pbkdf2_sha256$")
+        settings.PASSWORD_HASHERS = [
+            "job_posting.hashers.TunedScryptPasswordHasher",
+            "job_posting.hashers.TunedPBKDF2PasswordHasher",
+        ]
+        settings.PASSWORD_SCRYPT_WORK_FACTOR = 2**10
+        data = {"email": user_instance.email, "password": auth_user_password}
+        assert api_client.post(self.login_url, data).status_code == 200
+        user_instance.refresh_from_db()
+        assert user_instance.password.startswith("scrypt$1024$")
+
+    def test_default_policy_keeps_django_cost(self):
+        upstream = PBKDF2PasswordHasher()
+        encoded = upstream.encode("TestPass@1", upstream.salt())
+        hasher = get_hasher()
+        assert hasher.iterations >= upstream.iterations
+        # Hashes made at Django's cost are not re-hashed at a lower one.
+        assert not hasher.must_update(encoded)
+
+    def test_login_upgrades_hash_cost(
+        self,
+        api_client: APIClient,
+        user_instance: User,
+        auth_user_password: str,
+        settings,
+    ):
+        settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+        data = {"email": user_instance.email, "password": auth_user_password}
+        assert api_client.post(self.login_url, data).status_code == 200
+        user_instance.refresh_from_db()
+        assert user_instance.password.startswith("pbkdf2_sha256$1000$")
+        assert user_instance.check_password(auth_user_password)
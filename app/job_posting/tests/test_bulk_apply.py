@@ -0,0 +1,145 @@
+import json
+
+import pytest
+from django.urls import reverse
+from job_posting.models import JobAdvert, JobApplication
+from rest_framework.test import APIClient
+
+from .conftest import api_client_with_credentials
+from .factories import JobAdvertFactory, JobApplicationFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def application_data(job_advert: JobAdvert, **overrides) -> dict:
+    data = {
+        "first_name": "string",
+        "last_name": "string",
+        "email": "user@example.com",
+        "phone": "string",
+        "linkedin_url": "http://127.0.0.1:8000",
+        "github_url": "http://127.0.0.1:8000",
+        "website": "http://127.0.0.1:8000",
+        "experience_years": "0-1",
+        "cover_letter": "string",
+        "job_advert": str(job_advert.id),
+    }
+    data.update(overrides)
+    return data
+
+
+class TestBulkApply:
+    bulk_apply_url = reverse("job_posting:jobadvert-bulk-apply")
+
+    def test_bulk_apply_json(self, api_client: APIClient, authenticate_user, settings):
+        settings.BULK_APPLY_BATCH_SIZE = 2
+        first_advert, second_advert = JobAdvertFactory.create_batch(2)
+        unpublished_advert = JobAdvertFactory(is_published=False)
+        rows = [
+            application_data(first_advert, email="a@example.com"),
+            application_data(second_advert, email="b@example.com"),
+            application_data(first_advert, email="not-an-email"),
+            application_data(unpublished_advert),
+            application_data(first_advert, email="c@example.com"),
+        ]
+
+        api_client_with_credentials(authenticate_user, api_client)
+        response = api_client.post(self.bulk_apply_url, rows, format="json")
+        assert response.status_code == 200
+        returned_json = response.json()
+        assert returned_json["created"] == 3
+        assert returned_json["rejected"] == 2
+        assert [result["status"] for result in returned_json["results"]] == [
+            "created",
+            "created",
+            "rejected",
+            "rejected",
+            "created",
+        ]
+        assert "email" in returned_json["results"][2]["errors"]
+        assert "job_advert" in returned_json["results"][3]["errors"]
+
+        first_advert.refresh_from_db()
+        second_advert.refresh_from_db()
+        assert first_advert.applications_count == 2
+        assert second_advert.applications_count == 1
+        assert JobApplication.objects.count() == 3
+
+    def test_bulk_apply_ndjson(self, api_client: APIClient, authenticate_user):
+        job_advert: JobAdvert = JobAdvertFactory()
+        lines = [
+            json.dumps(application_data(job_advert, email="a@example.com")),
+            "{not json",
+            json.dumps(application_data(job_advert, email="b@example.com")),
+        ]
+
+        api_client_with_credentials(authenticate_user, api_client)
+        response = api_client.post(
+            self.bulk_apply_url,
+            "\n".join(lines),
+            content_type="application/x-ndjson",
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["status"] for result in results] == [
+            "created",
+            "rejected",
+            "created",
+        ]
+        job_advert.refresh_from_db()
+        assert job_advert.applications_count == 2
+
+    def test_bulk_apply_query_count(
+        self,
+        api_client: APIClient,
+        authenticate_user,
+        django_assert_max_num_queries,
+    ):
+        job_adverts = JobAdvertFactory.create_batch(5)
+        rows = [
+            application_data(job_advert, email=f"{i}@example.com")
+            for i in range(20)
+            for job_advert in job_adverts
+        ]
+
+        api_client_with_credentials(authenticate_user, api_client)
+        # Authentication, then per batch: published check, savepoint,
+        # INSERT, inserted id check, counter UPDATE and savepoint release.
+        with django_assert_max_num_queries(7):
+            response = api_client.post(self.bulk_apply_url, rows, format="json")
+        assert response.json()["created"] == 100
+
+    def test_bulk_apply_rejects_duplicates(
+        self, api_client: APIClient, authenticate_user
+    ):
+        job_advert: JobAdvert = JobAdvertFactory()
+        JobApplicationFactory(job_advert=job_advert, email="a@example.com")
+        rows = [
+            application_data(job_advert, email="A@example.com"),
+            application_data(job_advert, email="b@example.com"),
+            application_data(job_advert, email="B@Example.com"),
+        ]
+
+        api_client_with_credentials(authenticate_user, api_client)
+        response = api_client.post(self.bulk_apply_url, rows, format="json")
+        results = response.json()["results"]
+        assert [result["status"] for result in results] == [
+            "rejected",
+            "created",
+            "rejected",
+        ]
+        assert "email" in results[0]["errors"]
+        job_advert.refresh_from_db()
+        assert job_advert.applications_count == 2
+
+    def test_bulk_apply_requires_list(self, api_client: APIClient, authenticate_user):
+        job_advert: JobAdvert = JobAdvertFactory()
+        api_client_with_credentials(authenticate_user, api_client)
+        response = api_client.post(
+            self.bulk_apply_url, application_data(job_advert), format="json"
+        )
+        assert response.status_code == 400
+
+    def test_bulk_apply_requires_authentication(self, api_client: APIClient):
+        response = api_client.post(self.bulk_apply_url, [], format="json")
+        assert response.status_code == 401
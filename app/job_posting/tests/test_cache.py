@@ -0,0 +1,160 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from job_posting.cache import LIST_VERSION_KEY
+from job_posting.models import JobAdvert
+from rest_framework.test import APIClient
+
+from .conftest import api_client_with_credentials
+from .factories import JobAdvertFactory, JobApplicationFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestJobAdvertCache:
+    list_job_advert_url = reverse("job_posting:jobadvert-list")
+
+    def detail_url(self, job_advert: JobAdvert) -> str:
+        return reverse(
+            "job_posting:jobadvert-detail", kwargs={"pk": str(job_advert.id)}
+        )
+
+    def test_list_is_served_from_cache(
+        self, api_client: APIClient, django_assert_num_queries
+    ):
+        JobAdvertFactory.create_batch(2)
+        first_response = api_client.get(self.list_job_advert_url)
+
+        with django_assert_num_queries(0):
+            response = api_client.get(self.list_job_advert_url)
+        assert response.json() == first_response.json()
+        assert response["ETag"] == first_response["ETag"]
+        assert "Last-Modified" not in response
+
+    def test_list_is_invalidated_by_new_advert(self, api_client: APIClient):
+        JobAdvertFactory.create_batch(2)
+        api_client.get(self.list_job_advert_url)
+        JobAdvertFactory()
+        response = api_client.get(self.list_job_advert_url)
+        assert response.json()["total"] == 3
+
+    def test_detail_is_invalidated_by_application(self, api_client: APIClient):
+        job_advert: JobAdvert = JobAdvertFactory()
+        api_client.get(self.detail_url(job_advert))
+        JobApplicationFactory(job_advert=job_advert)
+        response = api_client.get(self.detail_url(job_advert))
+        assert response.json()["applicant_count"] == 1
+
+    def test_list_is_invalidated_by_unpublish(
+        self, api_client: APIClient, authenticate_user
+    ):
+        job_advert: JobAdvert = JobAdvertFactory(is_published=True)
+        assert api_client.get(self.list_job_advert_url).json()["total"] == 1
+
+        api_client_with_credentials(authenticate_user, api_client)
+        url = reverse(
+            "job_posting:jobadvert-unpublish", kwargs={"pk": str(job_advert.id)}
+        )
+        api_client.post(url)
+        api_client.credentials()
+        assert api_client.get(self.list_job_advert_url).json()["total"] == 0
+
+    def test_detail_not_modified(self, api_client: APIClient):
+        job_advert: JobAdvert = JobAdvertFactory()
+        etag = api_client.get(self.detail_url(job_advert))["ETag"]
+
+        response = api_client.get(self.detail_url(job_advert), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        job_advert.title = "Backend Eng"
+        job_advert.save()
+        response = api_client.get(self.detail_url(job_advert), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["title"] == "Backend Eng"
+
+    def test_list_not_modified_without_serializing(
+        self, api_client: APIClient, django_assert_num_queries
+    ):
+        JobAdvertFactory.create_batch(2)
+        etag = api_client.get(self.list_job_advert_url)["ETag"]
+        list_version = cache.get(LIST_VERSION_KEY)
+        cache.clear()
+        cache.set(LIST_VERSION_KEY, list_version, None)
+
+        # The ETag comes from the listing version; no page is serialized.
+        with django_assert_num_queries(0):
+            response = api_client.get(self.list_job_advert_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_detail_not_modified_without_serializing(
+        self, api_client: APIClient, django_assert_num_queries
+    ):
+        job_advert: JobAdvert = JobAdvertFactory()
+        etag = api_client.get(self.detail_url(job_advert))["ETag"]
+        cache.clear()
+
+        with django_assert_num_queries(1):
+            response = api_client.get(
+                self.detail_url(job_advert), HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == 304
+
+    def test_list_etag_changes_with_application(self, api_client: APIClient):
+        job_advert: JobAdvert = JobAdvertFactory()
+        etag = api_client.get(self.list_job_advert_url)["ETag"]
+        JobApplicationFactory(job_advert=job_advert)
+        response = api_client.get(self.list_job_advert_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_list_etag_changes_with_order(self, api_client: APIClient):
+        first, second = JobAdvertFactory.create_batch(2)
+        application = JobApplicationFactory(job_advert=first)
+        etag = api_client.get(self.list_job_advert_url)["ETag"]
+
+        # The total of applications stays the same but the order changes.
+        application.delete()
+        JobApplicationFactory(job_advert=second)
+        response = api_client.get(self.list_job_advert_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()["results"][0]["id"] == str(second.id)
+
+    def test_detail_modified_by_application(self, api_client: APIClient):
+        job_advert: JobAdvert = JobAdvertFactory()
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        JobAdvert.objects.filter(id=job_advert.id).update(updated_at=an_hour_ago)
+        last_modified = api_client.get(self.detail_url(job_advert))["Last-Modified"]
+
+        JobApplicationFactory(job_advert=job_advert)
+        response = api_client.get(
+            self.detail_url(job_advert), HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == 200
+        assert response.json()["applicant_count"] == 1
+
+    def test_detail_if_modified_since(self, api_client: APIClient):
+        job_advert: JobAdvert = JobAdvertFactory()
+        later = http_date((timezone.now() + timedelta(minutes=1)).timestamp())
+        earlier = http_date((timezone.now() - timedelta(minutes=1)).timestamp())
+
+        response = api_client.get(
+            self.detail_url(job_advert), HTTP_IF_MODIFIED_SINCE=later
+        )
+        assert response.status_code == 304
+
+        response = api_client.get(
+            self.detail_url(job_advert), HTTP_IF_MODIFIED_SINCE=earlier
+        )
+        assert response.status_code == 200
+        assert response.json()["id"] == str(job_advert.id)
+
+    def test_retrieve_missing_advert(self, api_client: APIClient):
+        response = api_client.get(
+            reverse("job_posting:jobadvert-detail", kwargs={"pk": "not-a-uuid"})
+        )
+        assert response.status_code == 404
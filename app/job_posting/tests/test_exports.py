@@ -0,0 +1,179 @@
+import csv
+import gzip
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from job_posting.models import DataExport, JobAdvert
+from job_posting.tasks import delete_old_exports, export_data
+from rest_framework.test import APIClient
+
+from .conftest import api_client_with_credentials
+from .factories import JobAdvertFactory, JobApplicationFactory, UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def export_root(settings, tmp_path):
+    settings.EXPORT_ROOT = str(tmp_path)
+    settings.EXPORT_CHUNK_SIZE = 2
+    return tmp_path
+
+
+class TestDataExport:
+    exports_url = reverse("export:export-list")
+
+    def request_export(
+        self, api_client: APIClient, django_capture_on_commit_callbacks, data: dict
+    ) -> dict:
+        """Request an export and run the enqueued task in process"""
+        with patch("job_posting.views.export_data.delay", side_effect=export_data):
+            with django_capture_on_commit_callbacks(execute=True):
+                response = api_client.post(self.exports_url, data)
+        assert response.status_code == 202
+        assert response.json()["status"] == "pending"
+        return response.json()
+
+    def test_export_applications(
+        self,
+        api_client: APIClient,
+        authenticate_user,
+        django_capture_on_commit_callbacks,
+    ):
+        job_advert: JobAdvert = JobAdvertFactory()
+        for i in range(5):
+            JobApplicationFactory(job_advert=job_advert, email=f"{i}@example.com")
+        api_client_with_credentials(authenticate_user, api_client)
+        data = {
+            "kind": "applications",
+            "job_advert": str(job_advert.id),
+            "export_format": "csv",
+            "compress": True,
+        }
+        export_id = self.request_export(
+            api_client, django_capture_on_commit_callbacks, data
+        )["id"]
+
+        url = reverse("export:export-detail", kwargs={"pk": export_id})
+        returned_json = api_client.get(url).json()
+        assert returned_json["status"] == "completed"
+        assert returned_json["progress"] == 100
+        assert returned_json["rows_written"] == returned_json["total_rows"] == 5
+        assert returned_json["download_url"].endswith(f"{url}download/")
+
+        response = api_client.get(returned_json["download_url"])
+        assert response.status_code == 200
+        assert f"applications-{export_id}.csv.gz" in response["Content-Disposition"]
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        rows = list(csv.reader(StringIO(content)))
+        email = rows[0].index("email")
+        assert [row[email] for row in rows[1:]] == [
+            f"{i}@example.com" for i in range(5)
+        ]
+
+    def test_export_company_adverts(
+        self,
+        api_client: APIClient,
+        authenticate_user,
+        django_capture_on_commit_callbacks,
+        export_root,
+    ):
+        JobAdvertFactory.create_batch(3, company_name="ABC")
+        JobAdvertFactory(company_name="XYZ")
+        api_client_with_credentials(authenticate_user, api_client)
+        data = {
+            "kind": "company_adverts",
+            "company_name": "ABC",
+            "export_format": "ndjson",
+        }
+        export_id = self.request_export(
+            api_client, django_capture_on_commit_callbacks, data
+        )["id"]
+
+        data_export = DataExport.objects.get(id=export_id)
+        assert data_export.status == "completed"
+        assert not list(export_root.glob("*.part"))
+        with data_export.file.open("r") as file:
+            lines = [json.loads(line) for line in file]
+        assert len(lines) == 3
+        assert {line["company_name"] for line in lines} == {"ABC"}
+
+    def test_failed_export(
+        self,
+        api_client: APIClient,
+        authenticate_user,
+        django_capture_on_commit_callbacks,
+    ):
+        api_client_with_credentials(authenticate_user, api_client)
+        data = {
+            "kind": "company_adverts",
+            "company_name": "ABC",
+            "export_format": "csv",
+        }
+        with patch("job_posting.tasks.write_export", side_effect=OSError("Disk full")):
+            with pytest.raises(OSError):
+                self.request_export(
+                    api_client, django_capture_on_commit_callbacks, data
+                )
+
+        data_export = DataExport.objects.get()
+        assert data_export.status == "failed"
+        assert data_export.error == "Disk full"
+        url = reverse("export:export-download", kwargs={"pk": str(data_export.id)})
+        response = api_client.get(url)
+        assert response.status_code == 409
+
+    def test_delete_old_exports(
+        self,
+        api_client: APIClient,
+        authenticate_user,
+        django_capture_on_commit_callbacks,
+        export_root,
+        settings,
+    ):
+        settings.EXPORT_RETENTION_DAYS = 7
+        JobAdvertFactory(company_name="ABC")
+        api_client_with_credentials(authenticate_user, api_client)
+        data = {
+            "kind": "company_adverts",
+            "company_name": "ABC",
+            "export_format": "csv",
+        }
+        old, recent = [
+            self.request_export(api_client, django_capture_on_commit_callbacks, data)
+            for _ in range(2)
+        ]
+        DataExport.objects.filter(id=old["id"]).update(
+            created_at=timezone.now() - timedelta(days=8)
+        )
+
+        assert delete_old_exports() == 1
+        data_export = DataExport.objects.get()
+        assert str(data_export.id) == recent["id"]
+        # Only the recent export's file is left.
+        assert [path.name for path in export_root.iterdir()] == [data_export.filename]
+
+    def test_export_requires_a_source(self, api_client: APIClient, authenticate_user):
+        api_client_with_credentials(authenticate_user, api_client)
+        response = api_client.post(
+            self.exports_url, {"kind": "applications", "export_format": "csv"}
+        )
+        assert response.status_code == 400
+        assert "job_advert" in response.json()
+
+    def test_exports_are_private(self, api_client: APIClient, authenticate_user):
+        data_export = DataExport.objects.create(
+            requested_by=UserFactory(),
+            kind="company_adverts",
+            company_name="ABC",
+            export_format="csv",
+        )
+        api_client_with_credentials(authenticate_user, api_client)
+        assert api_client.get(self.exports_url).json()["total"] == 0
+        url = reverse("export:export-detail", kwargs={"pk": str(data_export.id)})
+        assert api_client.get(url).status_code == 404
@@ -0,0 +1,220 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from job_posting.filters import JobAdvertFilter
+from job_posting.models import JobAdvert, unexpired
+from rest_framework.test import APIClient
+
+from .factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestJobAdvertFilters:
+    list_job_advert_url = reverse("job_posting:jobadvert-list")
+
+    def test_filter_by_employment_type_and_experience_level(
+        self, api_client: APIClient
+    ):
+        match = JobAdvertFactory(employment_type="Contract", experience_level="Senior")
+        JobAdvertFactory(employment_type="Contract", experience_level="Entry Level")
+        JobAdvertFactory(employment_type="Full Time", experience_level="Senior")
+
+        response = api_client.get(
+            self.list_job_advert_url,
+            {"employment_type": "Contract", "experience_level": "Senior"},
+        )
+        assert response.status_code == 200
+        assert [result["id"] for result in response.json()["results"]] == [
+            str(match.id)
+        ]
+
+    def test_filter_by_location_ignores_case(self, api_client: APIClient):
+        match = JobAdvertFactory(location="Lagos")
+        JobAdvertFactory(location="Abuja")
+
+        response = api_client.get(self.list_job_advert_url, {"location": "lagos"})
+        assert [result["id"] for result in response.json()["results"]] == [
+            str(match.id)
+        ]
+
+    def test_filter_by_created_at_range(self, api_client: APIClient):
+        older, newer = JobAdvertFactory.create_batch(2)
+        JobAdvert.objects.filter(id=older.id).update(created_at="2024-01-01T00:00Z")
+
+        response = api_client.get(
+            self.list_job_advert_url, {"created_after": "2024-06-01T00:00:00Z"}
+        )
+        assert [result["id"] for result in response.json()["results"]] == [
+            str(newer.id)
+        ]
+
+        response = api_client.get(
+            self.list_job_advert_url, {"created_before": "2024-06-01T00:00:00Z"}
+        )
+        assert [result["id"] for result in response.json()["results"]] == [
+            str(older.id)
+        ]
+
+    def test_invalid_filter(self, api_client: APIClient):
+        response = api_client.get(
+            self.list_job_advert_url, {"employment_type": "Forever"}
+        )
+        assert response.status_code == 400
+
+
+class TestJobAdvertFacets:
+    facets_url = reverse("job_posting:jobadvert-facets")
+
+    def test_facets(self, api_client: APIClient, django_assert_num_queries):
+        JobAdvertFactory(employment_type="Contract", location="Lagos")
+        JobAdvertFactory(employment_type="Contract", location="Abuja")
+        JobAdvertFactory(employment_type="Full Time", location="Lagos")
+        JobAdvertFactory(employment_type="Part Time", is_published=False)
+
+        # The choice facets and the location facet.
+        with django_assert_num_queries(2):
+            response = api_client.get(self.facets_url)
+        assert response.status_code == 200
+        facets = response.json()
+        assert facets["employment_type"] == [
+            {"value": "Full Time", "count": 1},
+            {"value": "Part Time", "count": 0},
+            {"value": "Contract", "count": 2},
+        ]
+        assert sum(item["count"] for item in facets["experience_level"]) == 3
+        assert facets["location"] == [
+            {"value": "Lagos", "count": 2},
+            {"value": "Abuja", "count": 1},
+        ]
+
+        with django_assert_num_queries(0):
+            assert api_client.get(self.facets_url).json() == facets
+
+    def test_facets_follow_filters(self, api_client: APIClient):
+        JobAdvertFactory(
+            employment_type="Contract", experience_level="Senior", location="Lagos"
+        )
+        JobAdvertFactory(
+            employment_type="Full Time", experience_level="Senior", location="Abuja"
+        )
+        JobAdvertFactory(
+            employment_type="Full Time",
+            experience_level="Entry Level",
+            location="Lagos",
+        )
+
+        response = api_client.get(self.facets_url, {"employment_type": "Contract"})
+        facets = response.json()
+        assert facets["location"] == [{"value": "Lagos", "count": 1}]
+        # The selected facet keeps the counts of its alternatives.
+        assert facets["employment_type"] == [
+            {"value": "Full Time", "count": 2},
+            {"value": "Part Time", "count": 0},
+            {"value": "Contract", "count": 1},
+        ]
+
+        response = api_client.get(
+            self.facets_url, {"employment_type": "Full Time", "location": "lagos"}
+        )
+        facets = response.json()
+        assert {item["value"]: item["count"] for item in facets["employment_type"]} == {
+            "Full Time": 1,
+            "Part Time": 0,
+            "Contract": 1,
+        }
+        assert {
+            item["value"]: item["count"] for item in facets["experience_level"]
+        } == {"Entry Level": 1, "Mid Level": 0, "Senior": 0}
+        assert facets["location"] == [
+            {"value": "Abuja", "count": 1},
+            {"value": "Lagos", "count": 1},
+        ]
+
+        response = api_client.get(self.facets_url, {"employment_type": "Forever"})
+        assert response.status_code == 400
+
+    def test_facets_etag_covers_other_values(self, api_client: APIClient):
+        JobAdvertFactory(employment_type="Contract")
+        params = {"employment_type": "Contract"}
+        etag = api_client.get(self.facets_url, params)["ETag"]
+
+        JobAdvertFactory(employment_type="Full Time")
+        response = api_client.get(self.facets_url, params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_facets_are_invalidated(self, api_client: APIClient):
+        JobAdvertFactory(location="Lagos")
+        api_client.get(self.facets_url)
+        JobAdvertFactory(location="Lagos")
+        response = api_client.get(self.facets_url)
+        assert response.json()["location"] == [{"value": "Lagos", "count": 2}]
+
+
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="Query plans are Postgres specific"
+)
+class TestJobAdvertFilterIndexes:
+    @pytest.fixture(autouse=True)
+    def skewed_adverts(self):
+        # Mostly adverts the filters below do not match, so that the planner
+        # sees each filter as selective and picks its index on its own.
+        JobAdvert.objects.bulk_create(
+            JobAdvertFactory.build(
+                employment_type="Full Time",
+                experience_level="Entry Level",
+                location="Remote",
+            )
+            for _ in range(1000)
+        )
+        JobAdvert.objects.bulk_create(
+            JobAdvertFactory.build(
+                employment_type="Full Time", experience_level="Senior"
+            )
+            for _ in range(10)
+        )
+        JobAdvertFactory(
+            employment_type="Contract", experience_level="Senior", location="Lagos"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {JobAdvert._meta.db_table}")
+
+    @pytest.mark.parametrize(
+        "params, index_name",
+        [
+            ({}, "jobadvert_listing_idx"),
+            ({"employment_type": "Contract"}, "jobadvert_pub_type_level_idx"),
+            (
+                {"employment_type": "Contract", "experience_level": "Senior"},
+                "jobadvert_pub_type_level_idx",
+            ),
+            ({"experience_level": "Senior"}, "jobadvert_pub_level_idx"),
+            ({"location": "lagos"}, "jobadvert_pub_location_idx"),
+            (
+                {
+                    "created_after": "2024-01-01T00:00:00Z",
+                    "created_before": "2024-02-01T00:00:00Z",
+                },
+                "jobadvert_pub_created_idx",
+            ),
+        ],
+    )
+    def test_published_filters_use_index(self, params: dict, index_name: str):
+        # The public listing's queryset
+        queryset = JobAdvert.objects.filter(unexpired(), is_published=True).order_by(
+            "-is_published", "-applications_count", "-created_at"
+        )
+        plan = JobAdvertFilter(params, queryset=queryset).qs[:20].explain()
+        assert "Seq Scan" not in plan
+        assert index_name in plan
+
+    def test_listing_skips_expired_adverts_in_index(self):
+        queryset = JobAdvert.objects.filter(unexpired(), is_published=True).order_by(
+            "-is_published", "-applications_count", "-created_at"
+        )
+        plan = queryset[:20].explain()
+        # The expiry check is an index condition, not a filter on fetched rows.
+        assert "jobadvert_listing_idx" in plan
+        index_cond = next(line for line in plan.splitlines() if "Index Cond" in line)
+        assert "COALESCE(expires_at, " in index_cond
+        assert "Filter" not in plan
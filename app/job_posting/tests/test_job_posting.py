@@ -1,12 +1,23 @@
-from unittest.mock import Mock, patch
+import csv
+import json
+import uuid
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from io import StringIO
 
 import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient
 from django.urls import reverse
-from job_posting.models import JobAdvert
+from django.utils import timezone
+from job_posting.models import JobAdvert, JobApplication, User
+from job_posting.tasks import expire_adverts, publish_due_adverts
 from rest_framework.test import APIClient
 
 from .conftest import api_client_with_credentials
-from .factories import JobAdvertFactory, JobApplicationFactory
+from .factories import JobAdvertFactory, JobApplicationFactory, UserFactory
 
 pytestmark = pytest.mark.django_db
 
@@ -15,7 +26,9 @@ class TestJobAdvert:
 
     list_job_advert_url = reverse("job_posting:jobadvert-list")
 
-    def test_post_advert(self, api_client: APIClient, authenticate_user):
+    def test_post_advert(
+        self, api_client: APIClient, authenticate_user, query_budget
+    ):
 
         data = {
             "title": "string",
@@ -27,7 +40,8 @@ class TestJobAdvert:
         }
 
         api_client_with_credentials(authenticate_user, api_client)
-        response = api_client.post(self.list_job_advert_url, data)
+        with query_budget(2):
+            response = api_client.post(self.list_job_advert_url, data)
         assert response.status_code == 201
         returned_json: dict = response.json()
         assert "id" in returned_json
@@ -39,69 +53,157 @@ class TestJobAdvert:
         assert response.status_code == 200
         assert response.json()["total"] == 5
 
-    def test_retrieve_an_advert(self, api_client: APIClient):
+    def test_list_adverts_query_count(
+        self, api_client: APIClient, query_budget, page_size: int
+    ):
+        for job_advert in JobAdvertFactory.create_batch(20):
+            JobApplicationFactory.create_batch(2, job_advert=job_advert)
+
+        # One COUNT for the paginator and one SELECT for the page.
+        with query_budget(2):
+            response = api_client.get(
+                self.list_job_advert_url, {"page_size": page_size}
+            )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert len(results) == page_size
+        assert all(result["applicant_count"] == 2 for result in results)
+
+    def test_query_budget_lists_queries(self, query_budget):
+        JobAdvertFactory.create_batch(2)
+        with pytest.raises(pytest.fail.Exception) as excinfo:
+            with query_budget(1):
+                for job_advert in JobAdvert.objects.all():
+                    job_advert.applications.count()
+        message = str(excinfo.value)
+        assert message.startswith("3 queries exceed the budget of 1:")
+        assert message.count('SELECT COUNT(*) AS "__count"') == 2
+
+    def test_list_adverts_exact_total(self, api_client: APIClient):
+        JobAdvertFactory.create_batch(3)
+        response = api_client.get(self.list_job_advert_url, {"page_size": 2})
+        returned_json = response.json()
+        assert returned_json["total"] == 3
+        assert returned_json["total_is_exact"]
+        assert returned_json["total_pages"] == 2
+
+    @pytest.mark.skipif(
+        connection.vendor != "postgresql", reason="Planner estimates need Postgres"
+    )
+    def test_list_adverts_approximate_total(self, api_client: APIClient, settings):
+        settings.PAGINATION_APPROXIMATE_COUNT_THRESHOLD = 1
+        JobAdvertFactory.create_batch(3)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {JobAdvert._meta.db_table}")
+
+        response = api_client.get(self.list_job_advert_url, {"page_size": 2})
+        returned_json = response.json()
+        # The estimate itself depends on the table statistics.
+        assert isinstance(returned_json["total"], int)
+        assert not returned_json["total_is_exact"]
+        assert returned_json["links"]["next"]
+
+        response = api_client.get(returned_json["links"]["next"])
+        assert len(response.json()["results"]) == 1
+        assert response.json()["links"]["next"] is None
+
+    def test_search_adverts(self, api_client: APIClient, query_budget):
+        in_description = JobAdvertFactory(
+            title="Accountant", description="Works alongside Python developers"
+        )
+        in_title = JobAdvertFactory(title="Python Developer")
+        JobAdvertFactory(title="Python Engineer", is_published=False)
+        JobAdvertFactory(title="Designer", description="Figma")
+
+        with query_budget(3):
+            response = api_client.get(self.list_job_advert_url, {"q": "python"})
+        assert response.status_code == 200
+        returned_json = response.json()
+        assert returned_json["total"] == 2
+        assert [result["id"] for result in returned_json["results"]] == [
+            str(in_title.id),
+            str(in_description.id),
+        ]
+
+    def test_retrieve_an_advert(self, api_client: APIClient, query_budget):
         job_advert = JobAdvertFactory(title="Eng", company_name="ABC")
         JobApplicationFactory.create_batch(3, job_advert=job_advert)
 
         url = reverse("job_posting:jobadvert-detail", kwargs={"pk": str(job_advert.id)})
-        response = api_client.get(url)
+        with query_budget(2):
+            response = api_client.get(url)
         assert response.status_code == 200
         returned_json = response.json()
         assert returned_json["applicant_count"] == 3
         assert returned_json["title"] == job_advert.title
         assert returned_json["company_name"] == job_advert.company_name
 
-    def test_update_an_advert(self, api_client: APIClient,authenticate_user):
+    def test_update_an_advert(
+        self, api_client: APIClient, authenticate_user, query_budget
+    ):
         job_advert = JobAdvertFactory(title="Eng", company_name="ABC")
         data = {
             "title": "Backend Eng"
         }
         url = reverse("job_posting:jobadvert-detail", kwargs={"pk": str(job_advert.id)})
         api_client_with_credentials(authenticate_user, api_client)
-        response = api_client.patch(url, data)
+        with query_budget(3):
+            response = api_client.patch(url, data)
         assert response.status_code == 200
         returned_json = response.json()
         assert returned_json["title"] == data["title"]
 
 
-    def test_publish_advert(self, api_client: APIClient, authenticate_user):
+    def test_publish_advert(
+        self, api_client: APIClient, authenticate_user, query_budget
+    ):
         job_advert: JobAdvert = JobAdvertFactory(is_published=False)
         api_client_with_credentials(authenticate_user, api_client)
         url = reverse(
             "job_posting:jobadvert-publish", kwargs={"pk": str(job_advert.id)}
         )
-        response = api_client.post(url)
+        with query_budget(3):
+            response = api_client.post(url)
         assert response.status_code == 200
         job_advert.refresh_from_db()
         assert job_advert.is_published
 
-    def test_unpublish_advert(self, api_client: APIClient, authenticate_user):
+    def test_unpublish_advert(
+        self, api_client: APIClient, authenticate_user, query_budget
+    ):
         job_advert: JobAdvert = JobAdvertFactory(is_published=True)
         api_client_with_credentials(authenticate_user, api_client)
         url = reverse(
             "job_posting:jobadvert-unpublish", kwargs={"pk": str(job_advert.id)}
         )
-        response = api_client.post(url)
+        with query_budget(3):
+            response = api_client.post(url)
         assert response.status_code == 200
         job_advert.refresh_from_db()
         assert not job_advert.is_published
 
-    def test_delete_unpublished_advert(self, api_client: APIClient, authenticate_user):
+    def test_delete_unpublished_advert(
+        self, api_client: APIClient, authenticate_user, query_budget
+    ):
         job_advert: JobAdvert = JobAdvertFactory(is_published=False)
         api_client_with_credentials(authenticate_user, api_client)
         url = reverse("job_posting:jobadvert-detail", kwargs={"pk": str(job_advert.id)})
-        response = api_client.delete(url)
+        with query_budget(5):
+            response = api_client.delete(url)
         assert response.status_code == 204
 
-    def test_delete_published_advert(self, api_client: APIClient, authenticate_user):
+    def test_delete_published_advert(
+        self, api_client: APIClient, authenticate_user, query_budget
+    ):
         job_advert: JobAdvert = JobAdvertFactory(is_published=True)
         api_client_with_credentials(authenticate_user, api_client)
         url = reverse("job_posting:jobadvert-detail", kwargs={"pk": str(job_advert.id)})
-        response = api_client.delete(url)
+        with query_budget(2):
+            response = api_client.delete(url)
         assert response.status_code == 400
         assert "error" in response.json()
 
-    def test_apply_for_advert(self, api_client: APIClient):
+    def test_apply_for_advert(self, api_client: APIClient, query_budget):
         job_advert: JobAdvert = JobAdvertFactory(is_published=True)
         data = {
             "first_name": "string",
@@ -115,13 +217,135 @@ class TestJobAdvert:
             "cover_letter": "string",
         }
         url = reverse("job_posting:jobadvert-apply", kwargs={"pk": str(job_advert.id)})
-        response = api_client.post(url, data)
+        # The advert, then the insert, its id and the count update in a
+        # savepoint.
+        with query_budget(6):
+            response = api_client.post(url, data)
         assert response.status_code == 200
         job_advert.refresh_from_db()
         assert job_advert.applications.count() == 1
+        assert job_advert.applications_count == 1
+
+    def test_apply_twice_with_same_email(self, api_client: APIClient, query_budget):
+        job_advert: JobAdvert = JobAdvertFactory(is_published=True)
+        JobApplicationFactory(job_advert=job_advert, email="user@example.com")
+        data = {
+            "first_name": "string",
+            "last_name": "string",
+            "email": "User@Example.com",
+            "phone": "string",
+            "linkedin_url": "http://127.0.0.1:8000",
+            "github_url": "http://127.0.0.1:8000",
+            "experience_years": "0-1",
+        }
+        url = reverse("job_posting:jobadvert-apply", kwargs={"pk": str(job_advert.id)})
+        with query_budget(6):
+            response = api_client.post(url, data)
+        assert response.status_code == 400
+        assert "email" in response.json()
+        job_advert.refresh_from_db()
+        assert job_advert.applications_count == 1
+
+    def test_apply_with_idempotency_key(self, api_client: APIClient):
+        job_advert: JobAdvert = JobAdvertFactory(is_published=True)
+        data = {
+            "first_name": "string",
+            "last_name": "string",
+            "email": "user@example.com",
+            "phone": "string",
+            "linkedin_url": "http://127.0.0.1:8000",
+            "github_url": "http://127.0.0.1:8000",
+            "experience_years": "0-1",
+        }
+        url = reverse("job_posting:jobadvert-apply", kwargs={"pk": str(job_advert.id)})
+        for _ in range(2):
+            response = api_client.post(url, data, HTTP_IDEMPOTENCY_KEY="retry-1")
+            assert response.status_code == 200
+        job_advert.refresh_from_db()
+        assert job_advert.applications_count == 1
+        assert job_advert.applications.get().idempotency_key == "retry-1"
+
+        response = api_client.post(url, data, HTTP_IDEMPOTENCY_KEY="k" * 256)
+        assert response.status_code == 400
+
+    def test_deleting_application_updates_count(self):
+        job_advert: JobAdvert = JobAdvertFactory()
+        applications = JobApplicationFactory.create_batch(3, job_advert=job_advert)
+        applications[0].delete()
+        job_advert.refresh_from_db()
+        assert job_advert.applications_count == 2
+
+    def test_deleting_adverts_skips_application_counts(self, query_budget):
+        job_adverts = JobAdvertFactory.create_batch(2)
+        for job_advert in job_adverts:
+            JobApplicationFactory.create_batch(3, job_advert=job_advert)
+
+        # Collecting the adverts and their applications, then a DELETE per
+        # table, with no UPDATE per application.
+        with query_budget(5) as context:
+            JobAdvert.objects.filter(
+                id__in=[job_advert.id for job_advert in job_adverts]
+            ).delete()
+        assert not any(
+            query["sql"].startswith("UPDATE") for query in context.captured_queries
+        )
+        assert not JobApplication.objects.exists()
+
+    def test_reconcile_application_counts(self, api_client: APIClient):
+        job_advert: JobAdvert = JobAdvertFactory()
+        JobApplicationFactory.create_batch(3, job_advert=job_advert)
+        JobAdvert.objects.filter(id=job_advert.id).update(applications_count=7)
+        response = api_client.get(self.list_job_advert_url)
+        assert response.json()["results"][0]["applicant_count"] == 7
+
+        out = StringIO()
+        call_command("reconcile_application_counts", stdout=out)
+        job_advert.refresh_from_db()
+        assert job_advert.applications_count == 3
+        assert "Reconciled 1 drifted advert(s)." in out.getvalue()
+        # The cached listing is dropped along with the drifted count.
+        response = api_client.get(self.list_job_advert_url)
+        assert response.json()["results"][0]["applicant_count"] == 3
+
+    def test_seed_jobboard(self):
+        def seed(method: str):
+            call_command(
+                "seed_jobboard",
+                adverts=20,
+                applications=500,
+                users=3,
+                batch_size=200,
+                method=method,
+                stdout=StringIO(),
+            )
+            return sorted(
+                JobApplication.objects.values_list("id", "job_advert_id", "email")
+            )
+
+        seeded = seed("copy")
+        assert len(seeded) == 500
+        assert User.objects.filter(email="user2@example.com").exists()
+        counts = sorted(
+            JobAdvert.objects.values_list("applications_count", flat=True),
+            reverse=True,
+        )
+        assert sum(counts) == 500
+        # A few adverts take most applications.
+        assert sum(counts[:4]) > 250
+
+        # Topping up again adds nothing.
+        assert seed("copy") == seeded
+
+        JobAdvert.objects.all().delete()
+        User.objects.all().delete()
+        # Users that were not seeded shift no seeded positions.
+        UserFactory()
+        assert seed("bulk-create") == seeded
+        assert User.objects.filter(email__startswith="user").count() == 3
+        assert User.objects.filter(email="user0@example.com").exists()
 
     def test_apply_for_unpublished_advert(
-        self, api_client: APIClient, authenticate_user
+        self, api_client: APIClient, authenticate_user, query_budget
     ):
         job_advert: JobAdvert = JobAdvertFactory(is_published=False)
 
@@ -138,26 +362,245 @@ class TestJobAdvert:
         }
         url = reverse("job_posting:jobadvert-apply", kwargs={"pk": str(job_advert.id)})
         api_client_with_credentials(authenticate_user, api_client)
-        response = api_client.post(url, data)
+        with query_budget(2):
+            response = api_client.post(url, data)
         assert response.status_code == 400
         assert "error" in response.json()
 
     def test_retrieve_advert_applications(
+        self, api_client: APIClient, authenticate_user, query_budget, page_size: int
+    ):
+        job_advert: JobAdvert = JobAdvertFactory()
+        JobApplicationFactory.create_batch(20, job_advert=job_advert)
+        api_client_with_credentials(authenticate_user, api_client)
+        url = reverse(
+            "job_posting:jobadvert-applications", kwargs={"pk": str(job_advert.id)}
+        )
+        # The token, the advert, one COUNT and one SELECT for the page.
+        with query_budget(4):
+            response = api_client.get(url, {"page_size": page_size})
+        assert response.status_code == 200
+        assert response.json()["total"] == 20
+        assert len(response.json()["results"]) == page_size
+
+    def test_cursor_pagination_of_advert_applications(
         self, api_client: APIClient, authenticate_user
     ):
         job_advert: JobAdvert = JobAdvertFactory()
-        JobApplicationFactory.create_batch(2, job_advert=job_advert)
+        applications = [
+            JobApplicationFactory(job_advert=job_advert, email=f"{i}@example.com")
+            for i in range(5)
+        ]
+        # Identical timestamps must be ordered by the UUID tiebreaker.
+        JobApplication.objects.filter(
+            id__in=[application.id for application in applications[1:3]]
+        ).update(created_at=applications[1].created_at)
+        expected_emails = list(
+            JobApplication.objects.order_by("created_at", "id").values_list(
+                "email", flat=True
+            )
+        )
+
         api_client_with_credentials(authenticate_user, api_client)
         url = reverse(
             "job_posting:jobadvert-applications", kwargs={"pk": str(job_advert.id)}
         )
+        response = api_client.get(url, {"pagination": "cursor", "page_size": 2})
+        pages = [response.json()]
+        while pages[-1]["links"]["next"]:
+            pages.append(api_client.get(pages[-1]["links"]["next"]).json())
+
+        assert len(pages) == 3
+        assert pages[0]["total"] is None
+        assert pages[0]["links"]["previous"] is None
+        assert [item["email"] for page in pages for item in page["results"]] == (
+            expected_emails
+        )
+
+        previous_page = api_client.get(pages[-1]["links"]["previous"]).json()
+        assert previous_page["results"] == pages[1]["results"]
+
+    def test_export_advert_applications_csv(
+        self, api_client: APIClient, authenticate_user, django_assert_num_queries
+    ):
+        job_advert: JobAdvert = JobAdvertFactory()
+        for i in range(3):
+            JobApplicationFactory(job_advert=job_advert, email=f"{i}@example.com")
+        api_client_with_credentials(authenticate_user, api_client)
+        url = reverse(
+            "job_posting:jobadvert-export-applications",
+            kwargs={"pk": str(job_advert.id)},
+        )
         response = api_client.get(url)
         assert response.status_code == 200
-        assert response.json()["total"] == 2
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv"
+        assert f"applications-{job_advert.id}.csv" in response["Content-Disposition"]
+
+        # Rows are only read from the database while the body is consumed.
+        with django_assert_num_queries(1, exact=False):
+            content = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(StringIO(content)))
+        email = rows[0].index("email")
+        assert [row[email] for row in rows[1:]] == [
+            "0@example.com",
+            "1@example.com",
+            "2@example.com",
+        ]
+
+    def test_export_streams_under_asgi(self, authenticate_user, settings):
+        settings.EXPORT_CHUNK_SIZE = 2
+        job_advert: JobAdvert = JobAdvertFactory()
+        for i in range(3):
+            JobApplicationFactory(job_advert=job_advert, email=f"{i}@example.com")
+        url = reverse(
+            "job_posting:jobadvert-export-applications",
+            kwargs={"pk": str(job_advert.id)},
+        )
+
+        async def export():
+            response = await AsyncClient().get(
+                url, headers={"Authorization": "Token " + authenticate_user}
+            )
+            # A sync iterator would be read into memory before being sent.
+            assert response.is_async
+            return b"".join([part async for part in response.streaming_content])
+
+        rows = list(csv.reader(StringIO(async_to_sync(export)().decode())))
+        email = rows[0].index("email")
+        assert [row[email] for row in rows[1:]] == [
+            "0@example.com",
+            "1@example.com",
+            "2@example.com",
+        ]
+
+    def test_export_csv_escapes_formulas(
+        self, api_client: APIClient, authenticate_user
+    ):
+        job_advert: JobAdvert = JobAdvertFactory()
+        JobApplicationFactory(
+            job_advert=job_advert,
+            first_name='=HYPERLINK("http://evil.example","x")',
+            last_name="-2+3",
+            cover_letter="@SUM(A1)",
+        )
+        api_client_with_credentials(authenticate_user, api_client)
+        url = reverse(
+            "job_posting:jobadvert-export-applications",
+            kwargs={"pk": str(job_advert.id)},
+        )
+        content = b"".join(api_client.get(url).streaming_content).decode()
+        header, row = list(csv.reader(StringIO(content)))
+        application = dict(zip(header, row))
+        assert application["first_name"] == '\'=HYPERLINK("http://evil.example","x")'
+        assert application["last_name"] == "'-2+3"
+        assert application["cover_letter"] == "'@SUM(A1)"
+        assert application["email"].endswith("@example.com")
+
+    def test_export_advert_applications_ndjson(
+        self, api_client: APIClient, authenticate_user
+    ):
+        job_advert: JobAdvert = JobAdvertFactory()
+        JobApplicationFactory.create_batch(2, job_advert=job_advert)
+        JobApplicationFactory(job_advert=JobAdvertFactory())
+        api_client_with_credentials(authenticate_user, api_client)
+        url = reverse(
+            "job_posting:jobadvert-export-applications",
+            kwargs={"pk": str(job_advert.id)},
+        )
+        response = api_client.get(url, {"export_format": "ndjson"})
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert len(lines) == 2
+        assert {json.loads(line)["job_advert_id"] for line in lines} == {
+            str(job_advert.id)
+        }
+
+        response = api_client.get(url, {"export_format": "xlsx"})
+        assert response.status_code == 400
+
+    def test_cursor_pagination_of_adverts(
+        self, api_client: APIClient, query_budget
+    ):
+        job_adverts = JobAdvertFactory.create_batch(4)
+        JobApplicationFactory.create_batch(2, job_advert=job_adverts[2])
+        with query_budget(3):
+            response = api_client.get(
+                self.list_job_advert_url,
+                {"pagination": "cursor", "page_size": 3, "include_total": "true"},
+            )
+        first_page = response.json()
+        assert first_page["total"] == 4
+        assert first_page["results"][0]["id"] == str(job_adverts[2].id)
+
+        second_page = api_client.get(first_page["links"]["next"]).json()
+        assert len(second_page["results"]) == 1
+        assert second_page["links"]["next"] is None
+
+    def test_invalid_cursor(self, api_client: APIClient):
+        response = api_client.get(
+            self.list_job_advert_url, {"pagination": "cursor", "cursor": "bogus"}
+        )
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize(
+        "position",
+        [
+            ["abc", 0, "2024-01-01T00:00:00+00:00", str(uuid.uuid4())],
+            [True, "abc", "2024-01-01T00:00:00+00:00", str(uuid.uuid4())],
+            [True, 0, "abc", str(uuid.uuid4())],
+            [True, 0, "2024-01-01T00:00:00+00:00", "abc"],
+            [True, {"a": 1}, "2024-01-01T00:00:00+00:00", str(uuid.uuid4())],
+        ],
+    )
+    def test_tampered_cursor(self, api_client: APIClient, position: list):
+        JobAdvertFactory.create_batch(2)
+        cursor = json.dumps({"p": position, "r": False}).encode()
+        response = api_client.get(
+            self.list_job_advert_url,
+            {"pagination": "cursor", "cursor": urlsafe_b64encode(cursor).decode()},
+        )
+        assert response.status_code == 404
+
+    def test_expired_adverts_are_hidden_from_public(
+        self, api_client: APIClient, authenticate_user
+    ):
+        now = timezone.now()
+        live = JobAdvertFactory(expires_at=now + timedelta(days=1))
+        expired = JobAdvertFactory(expires_at=now - timedelta(minutes=1))
+        JobAdvertFactory()
+
+        response = api_client.get(self.list_job_advert_url)
+        ids = [result["id"] for result in response.json()["results"]]
+        assert len(ids) == 2 and str(live.id) in ids
+        url = reverse("job_posting:jobadvert-detail", kwargs={"pk": str(expired.id)})
+        assert api_client.get(url).status_code == 404
+
+        api_client_with_credentials(authenticate_user, api_client)
+        assert api_client.get(self.list_job_advert_url).json()["total"] == 3
+
+    def test_expire_adverts(self, settings):
+        settings.EXPIRY_SWEEP_BATCH_SIZE = 2
+        now = timezone.now()
+        expired = JobAdvertFactory.create_batch(5, expires_at=now - timedelta(hours=1))
+        live = JobAdvertFactory(expires_at=now + timedelta(hours=1))
+
+        assert expire_adverts() == 5
+        assert expire_adverts() == 0
+        assert not JobAdvert.objects.filter(
+            id__in=[advert.id for advert in expired], is_published=True
+        ).exists()
+        live.refresh_from_db()
+        assert live.is_published
+
+        # Publishing an expired advert again drops its expiry time.
+        expired[0].publish_advert()
+        assert expire_adverts() == 0
+        expired[0].refresh_from_db()
+        assert expired[0].is_published and expired[0].expires_at is None
 
-    @patch("job_posting.tasks.schedule_job_advert.apply_async")
     def test_schedule_advert(
-        self, mocked_scheduler: Mock, api_client: APIClient, authenticate_user
+        self, api_client: APIClient, authenticate_user, query_budget
     ):
         job_advert: JobAdvert = JobAdvertFactory(is_published=False)
         api_client_with_credentials(authenticate_user, api_client)
@@ -165,12 +608,80 @@ class TestJobAdvert:
             "job_posting:jobadvert-schedule-advert", kwargs={"pk": str(job_advert.id)}
         )
         data = {"date_time": "2024-08-03T08:01:04.527Z"}
-        response = api_client.post(url, data)
+        with query_budget(3):
+            response = api_client.post(url, data)
         assert response.status_code == 200
-        mocked_scheduler.assert_called_once()
-        keyword_args: dict = mocked_scheduler.call_args.kwargs
-        assert keyword_args.get("eta")
-        assert keyword_args.get("kwargs").get("job_id") == job_advert.id
+        job_advert.refresh_from_db()
+        assert job_advert.publish_at.isoformat() == "2024-08-03T08:01:04.527000+00:00"
+        assert not job_advert.is_published
+
+        # Rescheduling replaces the publish time.
+        data = {"date_time": "2030-01-01T00:00:00Z"}
+        assert api_client.post(url, data).status_code == 200
+        job_advert.refresh_from_db()
+        assert job_advert.publish_at.year == 2030
+
+    def test_unschedule_advert(
+        self, api_client: APIClient, authenticate_user, query_budget
+    ):
+        job_advert: JobAdvert = JobAdvertFactory(
+            is_published=False, publish_at=timezone.now()
+        )
+        api_client_with_credentials(authenticate_user, api_client)
+        url = reverse(
+            "job_posting:jobadvert-unschedule-advert",
+            kwargs={"pk": str(job_advert.id)},
+        )
+        with query_budget(3):
+            assert api_client.post(url).status_code == 200
+        job_advert.refresh_from_db()
+        assert job_advert.publish_at is None
+        assert publish_due_adverts() == 0
+
+        response = api_client.post(url)
+        assert response.status_code == 400
+        assert "error" in response.json()
+
+    def test_publish_due_adverts(
+        self, api_client: APIClient, authenticate_user, django_assert_num_queries
+    ):
+        now = timezone.now()
+        due = JobAdvertFactory.create_batch(
+            3, is_published=False, publish_at=now - timedelta(minutes=1)
+        )
+        later = JobAdvertFactory(is_published=False, publish_at=now + timedelta(days=1))
+        api_client_with_credentials(authenticate_user, api_client)
+        url = reverse("job_posting:jobadvert-detail", kwargs={"pk": str(due[0].id)})
+        assert not api_client.get(url).json()["is_published"]
+
+        # The due adverts are selected, then published with one UPDATE.
+        with django_assert_num_queries(4):
+            assert publish_due_adverts() == 3
+        assert publish_due_adverts() == 0
+        assert JobAdvert.objects.filter(is_published=True).count() == 3
+        later.refresh_from_db()
+        assert not later.is_published and later.publish_at is not None
+        assert api_client.get(url).json()["is_published"]
+
+    def test_publish_due_adverts_clears_passed_expiry(self):
+        now = timezone.now()
+        expired = JobAdvertFactory(
+            is_published=False,
+            publish_at=now - timedelta(hours=1),
+            expires_at=now - timedelta(minutes=1),
+        )
+        expiring = JobAdvertFactory(
+            is_published=False,
+            publish_at=now - timedelta(hours=1),
+            expires_at=now + timedelta(days=1),
+        )
+
+        assert publish_due_adverts() == 2
+        assert expire_adverts() == 0
+        expired.refresh_from_db()
+        expiring.refresh_from_db()
+        assert expired.is_published and expired.expires_at is None
+        assert expiring.is_published and expiring.expires_at is not None
 
     def test_schedule_published_advert(self, api_client: APIClient, authenticate_user):
         job_advert: JobAdvert = JobAdvertFactory(is_published=True)
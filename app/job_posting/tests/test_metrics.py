@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from core.metrics import MetricsMiddleware
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from job_posting.models import JobAdvert
+from job_posting.tasks import publish_due_adverts
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+from .factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def metrics_enabled(settings):
+    settings.METRICS_ENABLED = True
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetrics:
+    list_job_advert_url = reverse("job_posting:jobadvert-list")
+    metrics_url = reverse("metrics")
+
+    def test_request_metrics(self, api_client: APIClient):
+        JobAdvertFactory.create_batch(2)
+        labels = {"view": "job_posting:jobadvert-list", "method": "GET"}
+        requests = sample(
+            "jobboard_request_duration_seconds_count", **labels, status="200"
+        )
+        queries = sample("jobboard_request_db_queries_sum", view=labels["view"])
+        hits = sample("jobboard_cache_lookups_total", cache="response", result="hit")
+
+        api_client.get(self.list_job_advert_url)
+        api_client.get(self.list_job_advert_url)
+
+        assert (
+            sample("jobboard_request_duration_seconds_count", **labels, status="200")
+            == requests + 2
+        )
+        assert sample("jobboard_request_db_queries_sum", view=labels["view"]) > queries
+        assert (
+            sample("jobboard_cache_lookups_total", cache="response", result="hit")
+            == hits + 1
+        )
+
+        response = api_client.get(self.metrics_url)
+        assert response.status_code == 200
+        assert b"jobboard_request_duration_seconds_bucket" in response.content
+
+    def test_scheduled_adverts_backlog(self, api_client: APIClient):
+        now = timezone.now()
+        JobAdvertFactory(is_published=False, publish_at=now - timedelta(minutes=1))
+        JobAdvertFactory.create_batch(
+            2, is_published=False, publish_at=now + timedelta(hours=1)
+        )
+        content = api_client.get(self.metrics_url).content.decode()
+        assert 'jobboard_scheduled_adverts{state="due"} 1.0' in content
+        assert 'jobboard_scheduled_adverts{state="pending"} 2.0' in content
+
+    def test_task_metrics(self):
+        JobAdvertFactory(
+            is_published=False, publish_at=timezone.now() - timedelta(minutes=2)
+        )
+        task = "job_posting.tasks.publish_due_adverts"
+        runs = sample(
+            "jobboard_celery_task_duration_seconds_count", task=task, state="SUCCESS"
+        )
+        published = sample("jobboard_advert_publish_lag_seconds_count")
+        lag = sample("jobboard_advert_publish_lag_seconds_sum")
+
+        assert publish_due_adverts.apply().get() == 1
+        assert (
+            sample(
+                "jobboard_celery_task_duration_seconds_count",
+                task=task,
+                state="SUCCESS",
+            )
+            == runs + 1
+        )
+        assert sample("jobboard_advert_publish_lag_seconds_count") == published + 1
+        assert sample("jobboard_advert_publish_lag_seconds_sum") - lag >= 120
+        assert JobAdvert.objects.filter(is_published=True).count() == 1
+
+    def test_metrics_token(self, api_client: APIClient, settings):
+        settings.METRICS_TOKEN = "scrape-me"
+        assert api_client.get(self.metrics_url).status_code == 401
+        response = api_client.get(
+            self.metrics_url, HTTP_AUTHORIZATION="Bearer scrape-me"
+        )
+        assert response.status_code == 200
+
+    def test_metrics_disabled(self, api_client: APIClient, settings):
+        settings.METRICS_ENABLED = False
+        assert api_client.get(self.metrics_url).status_code == 404
+
+    def test_async_middleware(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        middleware = MetricsMiddleware(get_response)
+        # Django calls it without a thread hop under ASGI.
+        assert iscoroutinefunction(middleware)
+        labels = {"view": "unmatched", "method": "GET", "status": "200"}
+        requests = sample("jobboard_request_duration_seconds_count", **labels)
+        request = RequestFactory().get("/nowhere/")
+        request.resolver_match = None
+        assert async_to_sync(middleware)(request).status_code == 200
+        assert (
+            sample("jobboard_request_duration_seconds_count", **labels) == requests + 1
+        )
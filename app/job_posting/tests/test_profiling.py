@@ -0,0 +1,104 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from core.profiling import ProfilingMiddleware, clear_profiles, recent_profiles
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from job_posting.models import User
+from rest_framework.test import APIClient
+
+from .conftest import api_client_with_credentials
+from .factories import JobAdvertFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def profiling(settings):
+    """Profile every request; must be requested before the client is used"""
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 1.0
+    clear_profiles()
+    yield
+    clear_profiles()
+
+
+class TestProfiling:
+    list_job_advert_url = reverse("job_posting:jobadvert-list")
+    profiling_url = reverse("profiling")
+
+    def test_profiles_requests(self, profiling, api_client: APIClient):
+        JobAdvertFactory.create_batch(3)
+        response = api_client.get(self.list_job_advert_url)
+        assert response.status_code == 200
+        # Only admins see the timings.
+        assert "Server-Timing" not in response
+
+        [profile] = recent_profiles()
+        assert profile.endpoint == "job_posting:jobadvert-list"
+        assert profile.status == 200
+        assert profile.queries > 0
+        assert profile.slowest_sql
+        assert profile.response_bytes == len(response.content)
+
+    def test_server_timing_for_admins(
+        self, profiling, api_client: APIClient, authenticate_user, user_instance: User
+    ):
+        JobAdvertFactory.create_batch(2)
+        api_client_with_credentials(authenticate_user, api_client)
+        response = api_client.get(self.list_job_advert_url, {"page": 1})
+        assert "Server-Timing" not in response
+
+        user_instance.is_staff = True
+        user_instance.save()
+        response = api_client.get(self.list_job_advert_url)
+        assert "db;dur=" in response["Server-Timing"]
+        assert "serializer;dur=" in response["Server-Timing"]
+
+    def test_async_middleware(self, profiling, user_instance: User):
+        async def get_response(request):
+            return HttpResponse()
+
+        middleware = ProfilingMiddleware(get_response)
+        # Django calls it without a thread hop under ASGI.
+        assert iscoroutinefunction(middleware)
+        request = RequestFactory().get("/nowhere/")
+        request.resolver_match = None
+        request.user = AnonymousUser()
+        assert "Server-Timing" not in async_to_sync(middleware)(request)
+
+        user_instance.is_staff = True
+        request.user = user_instance
+        assert "total;dur=" in async_to_sync(middleware)(request)["Server-Timing"]
+        assert len(recent_profiles()) == 2
+
+    def test_report_requires_admin(
+        self, profiling, api_client: APIClient, authenticate_user, user_instance: User
+    ):
+        api_client_with_credentials(authenticate_user, api_client)
+        assert api_client.get(self.profiling_url).status_code == 403
+
+        user_instance.is_staff = True
+        user_instance.save()
+        api_client.get(self.list_job_advert_url)
+        api_client.get(self.list_job_advert_url)
+        response = api_client.get(self.profiling_url, {"limit": 1})
+        assert response.status_code == 200
+        report = response.json()
+        endpoints = {summary["endpoint"]: summary for summary in report["endpoints"]}
+        assert endpoints["job_posting:jobadvert-list"]["requests"] == 2
+        assert endpoints["job_posting:jobadvert-list"]["max_queries"] > 0
+        assert len(report["recent"]) == 1
+
+    def test_unsampled_requests_are_not_profiled(
+        self, profiling, settings, api_client: APIClient
+    ):
+        settings.PROFILING_SAMPLE_RATE = 0
+        response = api_client.get(self.list_job_advert_url)
+        assert "Server-Timing" not in response
+        assert recent_profiles() == []
+
+    def test_disabled_by_default(self, api_client: APIClient):
+        response = api_client.get(self.list_job_advert_url)
+        assert "Server-Timing" not in response
@@ -0,0 +1,166 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from core.middleware import PIN_COOKIE, PrimaryPinningMiddleware
+from core.routers import PrimaryReplicaRouter, use_replica
+from django.conf import settings as django_settings
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from job_posting.cache import cached_response, make_etag
+from job_posting.models import JobAdvert
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from .conftest import api_client_with_credentials
+from .factories import JobAdvertFactory
+
+router = PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def replica(settings):
+    settings.DATABASE_REPLICA_ALIAS = "replica"
+    return "replica"
+
+
+class TestPrimaryReplicaRouter:
+    def test_reads_use_replica_when_allowed(self, replica):
+        assert router.db_for_read(JobAdvert) == "default"
+        with use_replica():
+            assert router.db_for_read(JobAdvert) == replica
+            with use_replica(False):
+                assert router.db_for_read(JobAdvert) == "default"
+            assert router.db_for_write(JobAdvert) == "default"
+
+    def test_reads_without_replica(self):
+        with use_replica():
+            assert router.db_for_read(JobAdvert) == "default"
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reads_in_transaction_use_primary(self, replica):
+        with use_replica(), transaction.atomic():
+            assert router.db_for_read(JobAdvert) == "default"
+
+    def test_migrations_only_run_on_primary(self):
+        assert router.allow_migrate("default", "job_posting")
+        assert not router.allow_migrate("replica", "job_posting")
+
+
+class TestPrimaryPinningMiddleware:
+    @pytest.fixture
+    def middleware(self):
+        return PrimaryPinningMiddleware(lambda request: router.db_for_read(JobAdvert))
+
+    def test_client_is_pinned_after_writing(self, middleware, replica, settings):
+        factory = RequestFactory()
+        client = {"HTTP_AUTHORIZATION": "Token a"}
+        assert middleware(factory.get("/", **client)) == replica
+        assert middleware(factory.post("/", **client)) == "default"
+        assert middleware(factory.get("/", **client)) == "default"
+        # Other clients still read from the replica.
+        assert middleware(factory.get("/", HTTP_AUTHORIZATION="Token b")) == replica
+
+        settings.DATABASE_PRIMARY_PIN_SECONDS = 0
+        assert middleware(factory.post("/", **client)) == "default"
+        assert middleware(factory.get("/", **client)) == replica
+
+    def test_without_replica(self, middleware):
+        assert middleware(RequestFactory().get("/")) == "default"
+
+    def test_anonymous_clients_are_pinned_by_cookie(self, replica):
+        middleware = PrimaryPinningMiddleware(
+            lambda request: HttpResponse(router.db_for_read(JobAdvert))
+        )
+        # Anonymous clients behind a proxy share its address.
+        factory = RequestFactory(REMOTE_ADDR="10.0.0.1")
+        response = middleware(factory.post("/"))
+        pin_id = response.cookies[PIN_COOKIE].value
+
+        assert middleware(factory.get("/")).content.decode() == replica
+        factory.cookies[PIN_COOKIE] = pin_id
+        assert middleware(factory.get("/")).content.decode() == "default"
+
+    def test_async_middleware(self, replica):
+        async def get_response(request):
+            return router.db_for_read(JobAdvert)
+
+        middleware = PrimaryPinningMiddleware(get_response)
+        # Django calls it without a thread hop under ASGI.
+        assert iscoroutinefunction(middleware)
+        factory = RequestFactory()
+        client = {"HTTP_AUTHORIZATION": "Token a"}
+        assert async_to_sync(middleware)(factory.get("/", **client)) == replica
+        assert async_to_sync(middleware)(factory.post("/", **client)) == "default"
+        assert async_to_sync(middleware)(factory.get("/", **client)) == "default"
+
+
+def test_cached_responses_are_built_from_primary(replica):
+    databases = []
+
+    def get_validators():
+        databases.append(router.db_for_read(JobAdvert))
+        return make_etag("state"), None
+
+    def build_response():
+        databases.append(router.db_for_read(JobAdvert))
+        return Response({"results": []})
+
+    request = RequestFactory().get("/")
+    with use_replica():
+        for _ in range(2):
+            response = cached_response(request, "key", get_validators, build_response)
+            assert response.data == {"results": []}
+        # Hits skip the database; the miss that filled the entry used the primary.
+        assert databases == ["default", "default"]
+        assert router.db_for_read(JobAdvert) == replica
+
+
+@pytest.mark.skipif(
+    "replica" not in django_settings.DATABASES,
+    reason="Set DATABASE_REPLICA_URL to test against a replica",
+)
+@pytest.mark.django_db(transaction=True, databases="__all__")
+def test_reads_from_replica_until_client_writes(
+    replica, api_client: APIClient, authenticate_user
+):
+    job_advert = JobAdvertFactory()
+    api_client_with_credentials(authenticate_user, api_client)
+    applications_url = reverse(
+        "job_posting:jobadvert-applications", kwargs={"pk": str(job_advert.id)}
+    )
+
+    with CaptureQueriesContext(connections[replica]) as replica_queries:
+        assert api_client.get(applications_url).json()["total"] == 0
+    assert replica_queries.captured_queries
+
+    data = {
+        "first_name": "string",
+        "last_name": "string",
+        "email": "user@example.com",
+        "phone": "string",
+        "linkedin_url": "http://127.0.0.1:8000",
+        "github_url": "http://127.0.0.1:8000",
+        "experience_years": "0-1",
+    }
+    url = reverse("job_posting:jobadvert-apply", kwargs={"pk": str(job_advert.id)})
+    with CaptureQueriesContext(connections[replica]) as replica_queries:
+        assert api_client.post(url, data).status_code == 200
+        response = api_client.get(applications_url)
+    assert response.json()["total"] == 1
+    assert not replica_queries.captured_queries
+
+
+@pytest.mark.skipif(
+    "replica" not in django_settings.DATABASES,
+    reason="Set DATABASE_REPLICA_URL to test against a replica",
+)
+@pytest.mark.django_db(transaction=True, databases="__all__")
+def test_cached_list_is_built_from_primary(replica, api_client: APIClient):
+    JobAdvertFactory()
+    list_url = reverse("job_posting:jobadvert-list")
+    with CaptureQueriesContext(connections[replica]) as replica_queries:
+        assert api_client.get(list_url).json()["total"] == 1
+        assert api_client.get(list_url).json()["total"] == 1
+    assert not replica_queries.captured_queries
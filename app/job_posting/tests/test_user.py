@@ -10,18 +10,20 @@ pytestmark = pytest.mark.django_db
 class TestUserRegistration:
     create_user_url = reverse("user:user-list")
 
-    def test_create_user(self, api_client: APIClient):
+    def test_create_user(self, api_client: APIClient, query_budget):
         data = {"email": "ray@gmail.co", "password": "12345"}
 
-        response = api_client.post(self.create_user_url, data)
+        with query_budget(2):
+            response = api_client.post(self.create_user_url, data)
         assert response.status_code == 200
         user_object = User.objects.get(email=data["email"])
         assert check_password(data["password"], user_object.password)
 
     def test_create_user_duplicate_email(
-        self, api_client: APIClient, user_instance: User
+        self, api_client: APIClient, user_instance: User, query_budget
     ):
         data = {"email": user_instance.email, "password": "xyzzyx"}
-        response = api_client.post(self.create_user_url, data)
+        with query_budget(1):
+            response = api_client.post(self.create_user_url, data)
         assert response.status_code == 400
         assert "email" in response.json()
@@ -0,0 +1,13 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from ..views import DataExportViewSet
+
+app_name = "export"
+
+router = DefaultRouter()
+router.register("", DataExportViewSet, basename="export")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -1,6 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from ..async_views import async_routes
 from ..views import JobViewSet
 
 app_name = "job_posting"
@@ -9,5 +10,5 @@ router = DefaultRouter()
 router.register("", JobViewSet)
 
 urlpatterns = [
-    path("", include(router.urls)),
+    path("", include(async_routes(router.urls))),
 ]
@@ -1,23 +1,80 @@
+from core.pagination import SelectablePagination
+from django.conf import settings
 from django.contrib.auth import authenticate
-from django.db.models import Count
-from drf_spectacular.utils import extend_schema
-from rest_framework import status, viewsets
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django_filters import utils as filter_utils
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import exceptions, mixins, status, viewsets
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from .models import JobAdvert
+from .bulk import ingest_applications
+from .cache import (
+    LIST_VERSION_KEY,
+    cached_response,
+    detail_cache_key,
+    get_audience,
+    get_version,
+    list_cache_key,
+    make_etag,
+)
+from .exports import (
+    APPLICATION_EXPORT_FIELDS,
+    EXPORT_FORMATS,
+    aiter_export,
+    export_rows,
+)
+from .filters import (
+    JobAdvertFilter,
+    JobAdvertSearchFilter,
+    count_facets,
+    split_facet_filters,
+)
+from .models import DataExport, JobAdvert, unexpired
+from .parsers import NDJSONParser
 from .serializers import (
+    BulkApplyResponseSerializer,
+    BulkJobApplicationSerializer,
     CreateJobAdvertSerializer,
     CreateUserSerializer,
+    DataExportSerializer,
+    JobAdvertFacetsSerializer,
     JobAdvertScheduleSerializer,
     JobApplicationSerializer,
     ListJobAdvertSerializer,
     LoginSerializer,
 )
-from .tasks import schedule_job_advert
+from .tasks import export_data
+
+# Model columns rendered by ListJobAdvertSerializer; anything else is deferred
+# when listing adverts.
+LIST_ADVERT_FIELDS = [
+    field
+    for field in ListJobAdvertSerializer.Meta.fields
+    if field != "applicant_count"
+] + ["applications_count"]
+
+def save_application(serializer: JobApplicationSerializer) -> None:
+    with transaction.atomic():
+        serializer.save()
+
+
+def application_context(request: Request, job_advert: JobAdvert) -> dict:
+    """The ``JobApplicationSerializer`` context of an apply request"""
+    idempotency_key = request.headers.get("Idempotency-Key") or None
+    if idempotency_key and len(idempotency_key) > 255:
+        raise exceptions.ValidationError(
+            {"error": "The Idempotency-Key header cannot exceed 255 characters."}
+        )
+    return {"job_advert": job_advert, "idempotency_key": idempotency_key}
 
 
 class CreateUserViewSet(viewsets.GenericViewSet):
@@ -95,21 +152,27 @@ class JobViewSet(viewsets.ModelViewSet):
     queryset = JobAdvert.objects.all()
     serializer_class = ListJobAdvertSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SelectablePagination
+    filter_backends = [DjangoFilterBackend, JobAdvertSearchFilter]
+    filterset_class = JobAdvertFilter
     http_method_names = ["get", "post", "patch","delete"]
 
     def get_queryset(self):
-        queryset = JobAdvert.objects.annotate(
-            application_count=Count("applications")
-        ).order_by("-is_published", "-application_count", "-created_at")
+        queryset = JobAdvert.objects.defer("search_vector").order_by(
+            "-is_published", "-applications_count", "-created_at"
+        )
 
         if not self.request.user.is_authenticated:
-            queryset = queryset.filter(is_published=True)
+            queryset = queryset.filter(unexpired(), is_published=True)
+
+        if self.action == "list":
+            queryset = queryset.only(*LIST_ADVERT_FIELDS)
 
         return queryset
 
     def get_permissions(self):
         permission_classes = self.permission_classes
-        if self.action in ["apply", "list", "retrieve"]:
+        if self.action in ["apply", "list", "retrieve", "facets"]:
             permission_classes = [AllowAny]
         return [permission() for permission in permission_classes]
 
@@ -118,6 +181,82 @@ class JobViewSet(viewsets.ModelViewSet):
             return CreateJobAdvertSerializer
         return super().get_serializer_class()
 
+    def get_list_validators(self):
+        """ETag of a response built from the whole listing, such as a page or facets"""
+        return self.list_validators(get_version(LIST_VERSION_KEY))
+
+    def list_validators(self, version: str):
+        # The listing version changes with every advert and application, which
+        # may change any page's contents or order, unlike their updated_at.
+        # There is no Last-Modified, as no timestamp follows every such change.
+        etag = make_etag(
+            self.request.build_absolute_uri(), get_audience(self.request), version
+        )
+        return etag, None
+
+    def get_detail_state_queryset(self):
+        return (
+            self.filter_queryset(self.get_queryset())
+            .filter(pk=self.kwargs["pk"])
+            .values("id", "updated_at", "applications_count", "is_published")
+        )
+
+    def get_detail_validators(self):
+        """ETag and Last-Modified of the advert a retrieve request would render"""
+        try:
+            state = self.get_detail_state_queryset().first()
+        except ValidationError:
+            state = None
+        return self.detail_validators(state)
+
+    def detail_validators(self, state: dict | None):
+        if state is None:
+            return None, None
+        etag = make_etag(get_audience(self.request), *state.values())
+        return etag, state["updated_at"]
+
+    def list(self, request: Request, *args, **kwargs):
+        return cached_response(
+            request,
+            list_cache_key(request),
+            self.get_list_validators,
+            lambda: super(JobViewSet, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request: Request, *args, **kwargs):
+        return cached_response(
+            request,
+            detail_cache_key(request, kwargs["pk"]),
+            self.get_detail_validators,
+            lambda: super(JobViewSet, self).retrieve(request, *args, **kwargs),
+        )
+
+    def get_facet_filters(self):
+        """The adverts matching every filter but the facets, and the facet values"""
+        queryset = JobAdvertSearchFilter().filter_queryset(
+            self.request, self.get_queryset(), self
+        )
+        filterset = self.filterset_class(
+            self.request.query_params, queryset=queryset, request=self.request
+        )
+        if not filterset.is_valid():
+            raise filter_utils.translate_validation(filterset.errors)
+        return split_facet_filters(filterset)
+
+    @extend_schema(responses=JobAdvertFacetsSerializer)
+    @action(methods=["GET"], detail=False, url_path="facets")
+    def facets(self, request: Request):
+        """
+        Count the adverts per filter value. Each facet is counted under the
+        other filters but not its own, so that alternatives keep their counts.
+        """
+        return cached_response(
+            request,
+            list_cache_key(request, prefix="facets"),
+            self.get_list_validators,
+            lambda: Response(count_facets(*self.get_facet_filters())),
+        )
+
     def paginate_results(self, queryset):
         page = self.paginate_queryset(queryset)
         if page is not None:
@@ -142,10 +281,9 @@ class JobViewSet(viewsets.ModelViewSet):
         detail=True,
     )
     def publish(self, request: Request, pk=None):
-        """Set a job advert as published"""
+        """Set a job advert as published, clearing an expiry time that has passed"""
         job_advert: JobAdvert = self.get_object()
-        job_advert.is_published = True
-        job_advert.save(update_fields=["is_published"])
+        job_advert.publish_advert()
         return Response({"message": "Advert published."})
 
     @extend_schema(
@@ -163,15 +301,29 @@ class JobViewSet(viewsets.ModelViewSet):
     def unpublish(self, request: Request, pk=None):
         job_advert: JobAdvert = self.get_object()
         job_advert.is_published = False
-        job_advert.save(update_fields=["is_published"])
+        job_advert.save(update_fields=["is_published", "updated_at"])
         return Response({"message": "Advert unpublished."})
 
     def destroy(self, request: Request, *args, **kwargs):
         job_advert: JobAdvert = self.get_object()
         if job_advert.is_published:
             return Response({"error": "Only unpublished adverts can be deleted."}, 400)
-        return super().destroy(request, *args, **kwargs)
+        # Not super().destroy(), which would fetch the advert again.
+        self.perform_destroy(job_advert)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "Idempotency-Key",
+                location=OpenApiParameter.HEADER,
+                description=(
+                    "A unique key per application. Retrying with the same key "
+                    "does not apply twice."
+                ),
+            ),
+        ],
+    )
     @action(
         methods=["POST"],
         detail=True,
@@ -179,18 +331,52 @@ class JobViewSet(viewsets.ModelViewSet):
         serializer_class=JobApplicationSerializer,
     )
     def apply(self, request: Request, pk=None):
-        """Apply for this job advert"""
+        """
+        Apply for this job advert. Each email can apply once per advert;
+        a retry carrying the same Idempotency-Key succeeds without applying
+        again.
+        """
         job_advert: JobAdvert = self.get_object()
         if not job_advert.is_published:
             return Response({"error": "You can only apply for published advert"}, 400)
 
         serializer = JobApplicationSerializer(
-            data=request.data, context={"job_advert": job_advert}
+            data=request.data, context=application_context(request, job_advert)
         )
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        save_application(serializer)
         return Response({"message": "Applied Successfully."})
 
+    @extend_schema(
+        request=BulkJobApplicationSerializer(many=True),
+        responses=BulkApplyResponseSerializer,
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk-apply",
+        serializer_class=BulkJobApplicationSerializer,
+        parser_classes=[JSONParser, NDJSONParser],
+    )
+    def bulk_apply(self, request: Request):
+        """
+        Apply for many job adverts at once with a JSON array or NDJSON stream
+        of applications, each naming its job_advert.
+        """
+        rows = request.data
+        if isinstance(rows, dict):
+            return Response({"error": "Expected a list of applications."}, 400)
+
+        results = ingest_applications(rows, settings.BULK_APPLY_BATCH_SIZE)
+        created = sum(result["status"] == "created" for result in results)
+        return Response(
+            {
+                "created": created,
+                "rejected": len(results) - created,
+                "results": results,
+            }
+        )
+
     @extend_schema(responses=JobApplicationSerializer(many=True))
     @action(
         methods=["GET"],
@@ -204,6 +390,37 @@ class JobViewSet(viewsets.ModelViewSet):
         job_applications = job_advert.applications.all()
         return self.paginate_results(job_applications)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "export_format", enum=[*EXPORT_FORMATS], default="csv"
+            ),
+        ],
+        responses={(200, "text/csv"): str, (200, "application/x-ndjson"): str},
+    )
+    @action(methods=["GET"], detail=True, url_path="applications/export")
+    def export_applications(self, request: Request, pk=None):
+        """Download every application to this job advert as CSV or NDJSON"""
+        job_advert: JobAdvert = self.get_object()
+        export_format = request.query_params.get("export_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": "Unsupported export format."}, 400)
+
+        render, content_type = EXPORT_FORMATS[export_format]
+        rows = export_rows(
+            job_advert.applications.order_by("created_at", "id"),
+            APPLICATION_EXPORT_FIELDS,
+            settings.EXPORT_CHUNK_SIZE,
+        )
+        content = render(APPLICATION_EXPORT_FIELDS, rows)
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_export(content, settings.EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="applications-{job_advert.id}.{export_format}"'
+        )
+        return response
+
     @action(
         methods=["POST"],
         detail=True,
@@ -222,7 +439,64 @@ class JobViewSet(viewsets.ModelViewSet):
             data=request.data, context={"job_advert": job_advert}
         )
         serializer.is_valid(raise_exception=True)
-        schedule_job_advert.apply_async(
-            kwargs={"job_id": job_advert.id}, eta=serializer.data["date_time"]
-        )
+        job_advert.publish_at = serializer.validated_data["date_time"]
+        job_advert.save(update_fields=["publish_at", "updated_at"])
         return Response({"message": "Scheduled successfully."})
+
+    @extend_schema(
+        request=None,
+        responses={
+            200: {
+                "type": "object",
+                "properties": {
+                    "message": {"type": "string", "example": "Schedule cancelled."},
+                },
+            },
+        },
+    )
+    @action(methods=["POST"], detail=True, url_path="unschedule")
+    def unschedule_advert(self, request: Request, pk=None):
+        """Cancel the scheduled publishing of an advert"""
+        job_advert: JobAdvert = self.get_object()
+        if job_advert.publish_at is None:
+            return Response({"error": "This advert is not scheduled."}, 400)
+
+        job_advert.publish_at = None
+        job_advert.save(update_fields=["publish_at", "updated_at"])
+        return Response({"message": "Schedule cancelled."})
+
+
+class DataExportViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Request exports, poll their progress and download them once written"""
+
+    queryset = DataExport.objects.all()
+    serializer_class = DataExportSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return super().get_queryset().filter(requested_by=self.request.user)
+
+    def create(self, request: Request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data_export: DataExport = serializer.save(requested_by=request.user)
+        transaction.on_commit(lambda: export_data.delay(str(data_export.id)))
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @extend_schema(responses={(200, "application/octet-stream"): bytes})
+    @action(methods=["GET"], detail=True, url_path="download")
+    def download(self, request: Request, pk=None):
+        """Download a completed export"""
+        data_export: DataExport = self.get_object()
+        if data_export.status != "completed":
+            return Response({"error": "Export is not ready."}, status.HTTP_409_CONFLICT)
+        return FileResponse(
+            data_export.file.open("rb"),
+            as_attachment=True,
+            filename=data_export.filename,
+        )